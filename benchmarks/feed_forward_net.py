@@ -0,0 +1,76 @@
+import argparse
+import time
+from typing import List
+
+import neat.utils as utils
+from neat.config import Config
+from neat.genotype.genome import Genome
+from neat.mutation import mutate
+from neat.neural_nets.feed_forward_net import FeedForwardNet
+
+
+def create_genomes(config: Config, num_genomes, num_mutations) -> List[Genome]:
+    """Create fully connected genomes and grow them by repeated mutation"""
+    genomes = []
+    for _ in range(num_genomes):
+        genome = Genome()
+        inputs = [genome.create_new_node("input") for _ in range(config.num_input_neurons)]
+        outputs = [genome.create_new_node("output") for _ in range(config.num_output_neurons)]
+        for input_node in inputs:
+            for output_node in outputs:
+                genome.create_new_edge(input_node.id, output_node.id)
+
+        for _ in range(num_mutations):
+            mutate(genome, config)
+        genomes.append(genome)
+    return genomes
+
+
+def benchmark(num_genomes, num_mutations, num_activations, seed):
+    utils.seed(seed)
+
+    config: Config = Config(
+        change_weight_mutation=0.7,
+        replace_weight_mutation=0.4,
+        add_node_mutation_rate=0.3,
+        add_connection_mutation_rate=0.5,
+        reenable_connection_rate=0.25,
+        species_elitism=1,
+        max_stagnation=5,
+        population_size=num_genomes,
+        num_input_neurons=3,
+        num_output_neurons=1,
+        num_of_generations=1,
+        species_difference=3,
+        genomes_to_save=0.4,
+        min_specie_size=2,
+        activation_function="tanh"
+    )
+    genomes = create_genomes(config, num_genomes, num_mutations)
+    num_edges = sum(len(genome.edges) for genome in genomes) / num_genomes
+    num_nodes = sum(len(genome.nodes) for genome in genomes) / num_genomes
+    print("{} genomes with on average {:.1f} nodes and {:.1f} edges".format(num_genomes, num_nodes, num_edges))
+
+    start = time.perf_counter()
+    neural_nets = [FeedForwardNet.create(genome, config) for genome in genomes]
+    duration = time.perf_counter() - start
+    print("create:   {:>12,.0f} nets per second".format(num_genomes / duration))
+
+    inputs = utils.rng.normal(0, 300, (num_activations, config.num_input_neurons)).tolist()
+    start = time.perf_counter()
+    for neural_net in neural_nets:
+        for input_values in inputs:
+            neural_net.activate(input_values)
+    duration = time.perf_counter() - start
+    print("activate: {:>12,.0f} activations per second".format(num_genomes * num_activations / duration))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the creation and activation of feed forward nets")
+    parser.add_argument("--genomes", type=int, default=200)
+    parser.add_argument("--mutations", type=int, default=30)
+    parser.add_argument("--activations", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    benchmark(args.genomes, args.mutations, args.activations, args.seed)
@@ -1,5 +1,9 @@
+from typing import List
+
 import pygame
 
+from flappy_bird.masks import get_mask
+
 
 class Bird:
     VELOCITY = -10.5
@@ -33,7 +37,8 @@ class Bird:
         self.pos_y += displacement
 
     def get_mask(self) -> pygame.Mask:
-        return pygame.mask.from_surface(self.bird_img)
+        return get_mask(self.bird_img)
 
-    def draw(self, window: pygame.Surface):
-        window.blit(self.bird_img, (self.pos_x, self.pos_y))
+    def draw(self, window: pygame.Surface) -> List[pygame.Rect]:
+        """Draw the bird and return the area which was drawn"""
+        return [window.blit(self.bird_img, (self.pos_x, self.pos_y))]
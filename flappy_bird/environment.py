@@ -0,0 +1,104 @@
+from typing import Tuple
+
+import numpy as np
+
+from flappy_bird.world import World
+
+
+class Environment:
+    """
+    Batched environment in which all birds of a world fly through the same pipes.
+    Each step takes the actions of all birds and returns their observations,
+    rewards and done masks as arrays, so any policy can be evaluated at array speed.
+    The rewards are the fitness rules of the game.
+    """
+    PASS_REWARD = 5
+    PIPE_COLLISION_REWARD = -1
+    GROUND_COLLISION_REWARD = -2
+    # reward of each bird for each frame it survives
+    FRAME_REWARD = 0.1
+
+    def __init__(self, world: World, max_frames=None, max_score=None):
+        """
+        :param max_frames: End the episode after this many frames
+        :param max_score: End the episode once a bird reaches this score
+        """
+        self.world: World = world
+        self.max_frames = max_frames
+        self.max_score = max_score
+
+        self.scores = np.empty(0, dtype=int)
+        self.num_frames = 0
+        self.truncated = False
+        self._next_pipe = None
+
+    @property
+    def done(self) -> bool:
+        """Whether all birds died or the frame or score limit is reached"""
+        return self.truncated or self.world.num_alive == 0
+
+    @property
+    def dones(self) -> np.ndarray:
+        """Which birds do not act anymore"""
+        if self.truncated:
+            return np.ones(len(self.world.alive), dtype=bool)
+        return ~self.world.alive
+
+    def reset(self, num_birds, seed=None) -> np.ndarray:
+        """
+        Start a new episode with num_birds birds and return their first observations
+        :param seed: Seed of the pipe track, a random track if not given
+        """
+        self.world.reset(num_birds, seed)
+        self.scores = np.zeros(num_birds, dtype=int)
+        self.num_frames = 0
+        self.truncated = False
+        self._advance()
+        return self.world.observations(self._next_pipe)
+
+    def step(self, actions: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Let the birds jump by the actions and move the world by one frame
+        :param actions: Whether each bird jumps, as bools or as 0 and 1.
+        The actions of birds which are done are ignored.
+        :return: The observations, the rewards of this frame and the done mask of each bird.
+        An observation is the height of the bird and its distance to the top and bottom
+        part of the next pipe.
+        """
+        # integer actions would be used as the indices of the birds instead of a mask
+        actions = np.asarray(actions, dtype=bool)
+        if actions.shape != self.world.alive.shape:
+            raise ValueError("Expected {} actions, got an array of shape {}".format(
+                len(self.world.alive), actions.shape))
+        self.world.jump(actions)
+
+        rewards = np.zeros(len(self.world.alive))
+        rewards[self.world.alive] += self.FRAME_REWARD
+        self.world.move()
+
+        if self.max_frames is not None and self.num_frames >= self.max_frames:
+            self.truncated = True
+        elif self.max_score is not None and self.scores.max() >= self.max_score:
+            self.truncated = True
+        elif self.world.num_alive > 0:
+            rewards += self._advance()
+
+        return self.world.observations(self._next_pipe), rewards, self.dones
+
+    def _advance(self) -> np.ndarray:
+        """Start the next frame by updating the pipes and killing the colliding birds"""
+        self.num_frames += 1
+        rewards = np.zeros(len(self.world.alive))
+
+        self._next_pipe, passed_pipe = self.world.update_pipes()
+        # all alive birds pass a pipe in the same frame
+        if passed_pipe:
+            self.scores[self.world.alive] += 1
+            rewards[self.world.alive] += self.PASS_REWARD
+
+        pipe_collisions, ground_collisions = self.world.check_collisions()
+        ground_collisions &= ~pipe_collisions
+        rewards[pipe_collisions] += self.PIPE_COLLISION_REWARD
+        rewards[ground_collisions] += self.GROUND_COLLISION_REWARD
+        self.world.kill(pipe_collisions | ground_collisions)
+        return rewards
@@ -1,15 +1,26 @@
 import argparse
+import functools
 import os
-from typing import List, Tuple
+import queue
+import threading
+from typing import Dict, Iterator, List, Optional, Tuple, Union
 
+import numpy as np
 import pygame
 
 from flappy_bird.bird import Bird
+from flappy_bird.environment import Environment
 from flappy_bird.ground import Ground
 from flappy_bird.pipe import Pipe
+from flappy_bird.world import World, WorldSnapshot
 from neat.config import Config
+from neat.fitness_memo import FitnessMemo
+from neat.islands import DirectoryTransport, IslandModel
 from neat.genotype.genome import Genome
+from neat.genotype.genome_store import GenomeStore
+from neat.neural_nets.batched_net import BatchedFeedForwardNet
 from neat.neural_nets.feed_forward_net import FeedForwardNet
+from neat.parallel import ParallelEvaluator, ParallelReproduction
 from neat.population import Population
 
 
@@ -27,31 +38,119 @@ class Game:
     NUM_FPS = 30
     POPULATION_SIZE = 30
     TANH_THRESHOLD = 0.5
+    # number of world snapshots which the simulation can be ahead of the renderer
+    SNAPSHOT_QUEUE_SIZE = 2
 
-    def __init__(self):
-        self.window = pygame.display.set_mode((self.WIDTH, self.HEIGHT))
+    def __init__(self, headless=False, seed=None, max_frames=None, max_score=100, render_every=1,
+                 render_champion=False, decouple_rendering=False):
+        """
+        :param headless: Run the game without a window, font and frame limiter.
+        Only the simulation is executed, which is used to train as fast as possible
+        on machines without a display.
+        :param seed: Seed of the pipe track on which all genomes are evaluated.
+        Every generation gets a new random track if not given.
+        :param max_frames: End the evaluation of a generation after this many frames
+        :param max_score: End the evaluation of a generation once a bird reaches this score.
+        Without a limit a generation with a bird which does not die anymore never ends.
+        :param render_every: Only render every n-th frame while training. The frame rate is
+        only limited on rendered frames, so the frames in between are simulated at full speed.
+        :param render_champion: Only render the alive bird with the highest fitness while training
+        :param decouple_rendering: Simulate the training at full speed in a thread and render
+        snapshots of it at the frame rate, dropping the frames which can not be rendered in time
+        """
+        self.headless = headless
+        self.seed = seed
+        self.max_frames = max_frames
+        self.max_score = max_score
+        self.render_every = render_every
+        self.render_champion = render_champion
+        self.decouple_rendering = decouple_rendering
+        self.window: Optional[pygame.Surface] = None
+        if not self.headless:
+            self.window = pygame.display.set_mode((self.WIDTH, self.HEIGHT))
 
         self.background_img: pygame.Surface = pygame.transform.scale(
-            pygame.image.load(os.path.join(self.IMG_PATH, "background.png")).convert_alpha(),
-            (self.WIDTH, self.HEIGHT))
-        self.ground_img: pygame.Surface = pygame.transform.scale2x(
-            pygame.image.load(os.path.join(self.IMG_PATH, "ground.png")).convert_alpha())
-        self.pipe_img: pygame.Surface = pygame.transform.scale2x(
-            pygame.image.load(os.path.join(self.IMG_PATH, "pipe.png")).convert_alpha())
-        self.bird_img: pygame.Surface = pygame.transform.scale2x(
-            pygame.image.load(os.path.join(self.IMG_PATH, "bird.png")).convert_alpha())
+            self._load_image("background.png", alpha=False), (self.WIDTH, self.HEIGHT))
+        self.ground_img: pygame.Surface = pygame.transform.scale2x(self._load_image("ground.png", alpha=False))
+        self.pipe_img: pygame.Surface = pygame.transform.scale2x(self._load_image("pipe.png"))
+        self.bird_img: pygame.Surface = pygame.transform.scale2x(self._load_image("bird.png"))
+        # share the flipped image between all pipes, so its mask is only computed once
+        self.top_pipe_img: pygame.Surface = pygame.transform.flip(self.pipe_img, False, True)
 
         # init font
-        pygame.font.init()
-        self.font = pygame.font.SysFont("arial", 30)
+        self.font: Optional[pygame.font.Font] = None
+        if not self.headless:
+            pygame.font.init()
+            self.font = pygame.font.SysFont("arial", 30)
 
         self.ground = Ground(self.GROUND_HEIGHT, self.ground_img)
+        self.world = World(self.bird_img, self.pipe_img, self.ground, self.BIRD_START_X,
+                           self.BIRD_START_Y, self.PIPE_START_X, self.SPACE_BETWEEN_PIPES)
+        # a headless game can be used just for its environment to evaluate any policy
+        self.environment = Environment(self.world, max_frames, max_score)
         self.high_score = 0
         self.generation = 0
 
-    def create_population(self):
-        """Create a population for the neat algorithm"""
-        config: Config = Config(
+        # rendered texts by their content and color
+        self._texts: Dict[Tuple[str, Tuple[int, int, int]], pygame.Surface] = {}
+        # areas of the window which were drawn in the last frame, None if the whole window has to be drawn
+        self._dirty_rects: Optional[List[pygame.Rect]] = None
+
+    def _load_image(self, file_name, alpha=True) -> pygame.Surface:
+        """
+        Load an image of the game.
+        Converting the pixel format requires a display, so headless games keep the
+        format of the file, which results in the same collision masks.
+        :param alpha: Keep the transparency of the image. Opaque images are converted
+        without alpha channel, which makes them faster to draw.
+        """
+        image = pygame.image.load(os.path.join(self.IMG_PATH, file_name))
+        if self.headless:
+            return image
+        return image.convert_alpha() if alpha else image.convert()
+
+    def create_population(self, num_workers=1, memoize=False, fitness_threshold=None,
+                          compatibility_cache_size=0) -> Genome:
+        """
+        Create a population for the neat algorithm and return the best genome
+        :param num_workers: Evaluate and produce the genomes of each generation in this many
+        headless worker processes instead of in this game
+        :param memoize: Do not play unchanged genomes again, which requires the seed of the game
+        since a genome only reaches the same fitness on the same pipe track
+        :param fitness_threshold: Stop the training once a genome reaches this fitness
+        :param compatibility_cache_size: Cache this many compatibility scores of the speciation
+        and print the hits of the cache after each generation
+        """
+        config = self._create_config(fitness_threshold, compatibility_cache_size)
+        population: Population = Population.create(config)
+        reporter = Game._report_compatibility_cache if compatibility_cache_size > 0 else None
+        if num_workers <= 1:
+            return population.run(self._memoize(self.evaluate_genomes) if memoize else self.evaluate_genomes,
+                                  reporter=reporter)
+
+        with ParallelEvaluator(num_workers, _evaluate_shard, _init_worker, self.seed,
+                               (self.max_frames, self.max_score)) as evaluator:
+            population.produce_offspring = ParallelReproduction(evaluator.pool).produce
+            return population.run(self._memoize(evaluator.evaluate) if memoize else evaluator.evaluate,
+                                  reporter=reporter)
+
+    def create_islands(self, num_islands, migration_interval=5, num_migrants=2, migration_dir=None,
+                       memoize=False, fitness_threshold=None) -> Optional[Genome]:
+        """
+        Evolve a population per island in its own headless process and return the best genome
+        :param migration_interval: The number of generations between two exchanges of the best genomes
+        :param num_migrants: The number of genomes an island sends to the next one
+        :param migration_dir: Exchange the genomes through files in this directory instead of queues
+        """
+        transport = None if migration_dir is None else DirectoryTransport(migration_dir)
+        create_evaluation_function = functools.partial(
+            _create_island_evaluation, self.seed, self.max_frames, self.max_score, memoize)
+        islands = IslandModel(self._create_config(fitness_threshold), create_evaluation_function,
+                              num_islands, migration_interval, num_migrants, transport)
+        return islands.run()
+
+    def _create_config(self, fitness_threshold=None, compatibility_cache_size=0) -> Config:
+        return Config(
             change_weight_mutation=0.7,
             replace_weight_mutation=0.4,
             add_node_mutation_rate=0.1,
@@ -66,36 +165,76 @@ class Game:
             species_difference=3,
             genomes_to_save=0.4,
             min_specie_size=2,
-            activation_function="tanh"
+            activation_function="tanh",
+            fitness_threshold=fitness_threshold,
+            compatibility_cache_size=compatibility_cache_size
         )
 
-        population: Population = Population.create(config)
-        population.run(self.evaluate_genomes)
+    @staticmethod
+    def _report_compatibility_cache(population: Population):
+        print("Generation {}, compatibility cache: {}".format(
+            population.generation, population.species.compatibility_cache))
 
-    def _update_window(self, pipes: List[Pipe], birds: List[Bird], num_alive=None):
-        """Update the position of the bird and the pipes in the game window"""
-        self.window.blit(self.background_img, (0, 0))
+    def _memoize(self, evaluation_function) -> FitnessMemo:
+        return FitnessMemo(evaluation_function, self.seed)
 
+    @staticmethod
+    def _move_objects(pipes: List[Pipe], birds: List[Bird]):
+        """Move the alive birds and the pipes by one frame"""
         for bird in birds:
             if bird.alive:
                 bird.move()
-                bird.draw(self.window)
 
         for pipe in pipes:
             pipe.move()
-            pipe.draw(self.window)
 
-        self.ground.draw(self.window)
+    def _update_window(self, objects: List[Union[Bird, Pipe, World, WorldSnapshot]], num_alive=None):
+        """
+        Draw the birds and the pipes in the game window.
+        Only the areas which were drawn in the last or in this frame are redrawn and updated on the screen.
+        """
+        if self._dirty_rects is None:
+            self.window.blit(self.background_img, (0, 0))
+            self.ground.draw(self.window)
+        else:
+            # erase the objects of the last frame
+            for rect in self._dirty_rects:
+                self.window.blit(self.background_img, rect, rect)
+                self.ground.draw(self.window, rect)
+
+        rects = []
+        for game_object in objects:
+            rects.extend(game_object.draw(self.window))
+
+        # the ground covers the lower end of the pipes
+        for rect in rects:
+            self.ground.draw(self.window, rect)
 
         if num_alive is not None:
-            alive_gen_display = self.font.render(
-                "Alive: {}, Curr gen: {}".format(num_alive, self.generation), True, self.BLACK)
-            self.window.blit(alive_gen_display, (10, 900))
-
-        score_display = self.font.render("High score: {}".format(self.high_score), True, self.WHITE)
-        self.window.blit(score_display, (10, 10))
-
-        pygame.display.update()
+            alive_gen_display = self._render_text(
+                "Alive: {}, Curr gen: {}".format(num_alive, self.generation), self.BLACK)
+            rects.append(self.window.blit(alive_gen_display, (10, 900)))
+
+        score_display = self._render_text("High score: {}".format(self.high_score), self.WHITE)
+        rects.append(self.window.blit(score_display, (10, 10)))
+
+        if self._dirty_rects is None:
+            pygame.display.update()
+        else:
+            pygame.display.update(self._dirty_rects + rects)
+        self._dirty_rects = rects
+
+    def _render_text(self, text, color) -> pygame.Surface:
+        """Render the text, which is only rendered again once its content changed"""
+        key = (text, color)
+        surface = self._texts.get(key)
+        if surface is None:
+            # the old texts are not shown anymore
+            if len(self._texts) >= 100:
+                self._texts.clear()
+            surface = self.font.render(text, True, color)
+            self._texts[key] = surface
+        return surface
 
     def _evaluate_pipes(self, pipes: List[Pipe], bird: Bird) -> Tuple[Pipe, bool, bool]:
         """
@@ -116,7 +255,7 @@ class Game:
                 continue
 
             if pipe.pos_x <= self.PIPE_START_X - self.SPACE_BETWEEN_PIPES and len(pipes) < 2:
-                pipes.append(Pipe(self.PIPE_START_X, self.pipe_img))
+                pipes.append(Pipe(self.PIPE_START_X, self.pipe_img, top_img=self.top_pipe_img))
 
             if pipe.pos_x + self.pipe_img.get_width() <= self.BIRD_START_X:
                 pipe.passed = True
@@ -129,77 +268,109 @@ class Game:
         front_pipe = pipes[0] if not pipes[0].passed else pipes[1]
         return front_pipe, passed_pipe, is_colliding
 
-    def evaluate_genomes(self, genomes: List[Genome], config: Config):
+    def evaluate_genomes(self, genomes: List[Genome], config: Config, seed=None):
         """
         Play the game based on the output of the neural net for each genome / bird to
-        evaluate the genomes
+        evaluate the genomes.
+        All birds are simulated at once in the world and all neural nets are
+        activated at once in a batched net.
+        The evaluation ends once all birds died or the frame or score limit is reached.
+        :param seed: Seed of the pipe track, the seed of the game if not given
         """
         self.generation += 1
-        clock = pygame.time.Clock()
 
         num_populations = len(genomes)
-        num_alive = num_populations
-
-        pipes = [Pipe(self.PIPE_START_X, self.pipe_img)]
-        neural_nets: List[FeedForwardNet] = []
-        birds: List[Bird] = []
-        scores = []
-        for genome in genomes:
-            genome.fitness = 0
-            neural_nets.append(FeedForwardNet.create(genome, config))
-            birds.append(Bird(self.BIRD_START_X, self.BIRD_START_Y, self.bird_img))
-            scores.append(0)
-
-        run = True
-        while run and num_alive > 0:
-            clock.tick(self.NUM_FPS)
-
-            for i in range(num_populations):
-                curr_bird = birds[i]
-
-                if not curr_bird.alive:
-                    continue
-
-                next_pipe, passed_pipe, is_colliding = self._evaluate_pipes(pipes, curr_bird)
+        neural_nets: List[FeedForwardNet] = [FeedForwardNet.get(genome, config) for genome in genomes]
+        batched_net = BatchedFeedForwardNet.create(neural_nets, config)
+        fitnesses = np.zeros(num_populations)
+
+        frames = self._simulate(batched_net, fitnesses, self.seed if seed is None else seed)
+        if self.headless:
+            # there is no reason to limit the frame rate if nobody is watching
+            for _ in frames:
+                pass
+        elif self.decouple_rendering:
+            self._render_decoupled(frames, fitnesses)
+        else:
+            clock = pygame.time.Clock()
+            for num_frames in frames:
+                if num_frames % self.render_every == 0:
+                    clock.tick(self.NUM_FPS)
+                    self._select_drawn_birds(fitnesses)
+                    self._update_window([self.world], self.world.num_alive)
+
+        for genome, fitness in zip(genomes, fitnesses):
+            genome.fitness = float(fitness)
+
+    def _simulate(self, batched_net: BatchedFeedForwardNet, fitnesses: np.ndarray, seed) -> Iterator[int]:
+        """
+        Let the neural nets play in the environment frame by frame and add up the rewards
+        of the birds as their fitnesses until all birds died or the frame or score limit is reached.
+        Yield the number of simulated frames after each frame.
+        """
+        # use the height of the bird and the distance to the top and bottom
+        # pipe as the weights for the input neurons
+        observations = self.environment.reset(len(fitnesses), seed)
 
-                if passed_pipe:
-                    scores[i] += 1
-                    genomes[i].fitness += 5
+        num_frames = 0
+        while not self.environment.done:
+            outputs = batched_net.activate(observations)
+            observations, rewards, _ = self.environment.step(outputs[:, 0] > self.TANH_THRESHOLD)
+            fitnesses += rewards
 
-                if is_colliding:
-                    curr_bird.alive = False
-                    num_alive -= 1
-                    genomes[i].fitness -= 1
-                    continue
+            self.high_score = max(self.high_score, int(self.environment.scores.max()))
+            num_frames += 1
+            yield num_frames
 
-                if self.ground.is_colliding(curr_bird):
-                    curr_bird.alive = False
-                    num_alive -= 1
-                    genomes[i].fitness -= 2
-                    continue
+    def _render_decoupled(self, frames: Iterator[int], fitnesses: np.ndarray):
+        """
+        Simulate the frames at full speed in a thread and render the window at the frame rate.
+        The simulation publishes snapshots of the world through a bounded queue and drops
+        them while the queue is full, so watching the training does not slow it down.
+        The renderer only shows the newest snapshot and skips the older ones.
+        """
+        snapshots: "queue.Queue[WorldSnapshot]" = queue.Queue(self.SNAPSHOT_QUEUE_SIZE)
+        errors: List[BaseException] = []
+
+        def simulate():
+            try:
+                for num_frames in frames:
+                    # the simulation is the only producer, so the queue can not fill up in between
+                    if num_frames % self.render_every == 0 and not snapshots.full():
+                        self._select_drawn_birds(fitnesses)
+                        snapshots.put_nowait(self.world.snapshot())
+            except BaseException as error:
+                errors.append(error)
+
+        simulation = threading.Thread(target=simulate, daemon=True)
+        simulation.start()
 
-                # use the height of the bird and the distance to the top and bottom
-                # pipe as the weights for the input neurons
-                input_weights = [curr_bird.pos_y,
-                                 curr_bird.pos_y - next_pipe.top_y,
-                                 curr_bird.pos_y - next_pipe.bottom_y]
+        clock = pygame.time.Clock()
+        while simulation.is_alive() or not snapshots.empty():
+            clock.tick(self.NUM_FPS)
 
-                outputs = neural_nets[i].activate(input_weights)
-                if outputs[0] > self.TANH_THRESHOLD:
-                    curr_bird.jump()
+            snapshot: Optional[WorldSnapshot] = None
+            while not snapshots.empty():
+                snapshot = snapshots.get_nowait()
+            if snapshot is not None:
+                self._update_window([snapshot], snapshot.num_alive)
 
-                # give extra 0.1 fitness for each frame the bird survives
-                genomes[i].fitness += 0.1
+        simulation.join()
+        if errors:
+            raise errors[0]
 
-            self.high_score = max(self.high_score, max(scores))
-            self._update_window(pipes, birds, num_alive)
+    def _select_drawn_birds(self, fitnesses: np.ndarray):
+        """Only draw the alive bird with the highest fitness if only the champion is rendered"""
+        if self.render_champion and self.world.num_alive > 0:
+            champion = np.argmax(np.where(self.world.alive, fitnesses, -np.inf))
+            self.world.drawn_birds = np.arange(len(fitnesses)) == champion
 
     def play_game(self) -> int:
         """Let the user play the game"""
         clock = pygame.time.Clock()
 
         bird = Bird(self.BIRD_START_X, self.BIRD_START_Y, self.bird_img)
-        pipes = [Pipe(self.PIPE_START_X, self.pipe_img)]
+        pipes = [Pipe(self.PIPE_START_X, self.pipe_img, top_img=self.top_pipe_img)]
 
         run = True
         while run:
@@ -220,21 +391,97 @@ class Game:
             if passed_pipe:
                 self.high_score += 1
 
-            self._update_window(pipes, [bird])
+            self._move_objects(pipes, [bird])
+            self._update_window([bird, *pipes])
 
         pygame.quit()
         return self.high_score
 
 
+# The game of a worker process of the ParallelEvaluator
+_worker_game: Optional[Game] = None
+
+
+def _init_worker(max_frames, max_score):
+    global _worker_game
+    _worker_game = Game(headless=True, max_frames=max_frames, max_score=max_score)
+
+
+def _create_island_evaluation(seed, max_frames, max_score, memoize):
+    """Create the game of an island process of the IslandModel"""
+    game = Game(headless=True, seed=seed, max_frames=max_frames, max_score=max_score)
+    return game._memoize(game.evaluate_genomes) if memoize else game.evaluate_genomes
+
+
+def _evaluate_shard(store: GenomeStore, config: Config, seed) -> List[float]:
+    genomes = list(store.unpack().values())
+    _worker_game.evaluate_genomes(genomes, config, seed)
+    return [genome.fitness for genome in genomes]
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Play the game flappy bird")
     parser.add_argument("-play", action="store_true")
+    parser.add_argument("--headless", action="store_true",
+                        help="train without a window and without limiting the frame rate")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="number of processes which evaluate and reproduce the genomes in parallel, "
+                             "requires --headless")
+    parser.add_argument("--islands", type=int, default=1,
+                        help="number of populations which evolve in parallel processes, requires --headless")
+    parser.add_argument("--migration-interval", type=int, default=5,
+                        help="number of generations between two exchanges of the best genomes of the islands")
+    parser.add_argument("--migrants", type=int, default=2,
+                        help="number of genomes an island sends to the next island")
+    parser.add_argument("--migration-dir",
+                        help="exchange the genomes of the islands through files in this directory")
+    parser.add_argument("--seed", type=int,
+                        help="evaluate all generations on the same pipe track generated from this seed")
+    parser.add_argument("--memoize", action="store_true",
+                        help="do not play unchanged genomes again, requires --seed")
+    parser.add_argument("--compatibility-cache", type=int, default=0,
+                        help="cache this many compatibility scores of the speciation and print the cache hits "
+                             "of each generation")
+    parser.add_argument("--max-frames", type=int,
+                        help="end the evaluation of a generation after this many frames")
+    parser.add_argument("--max-score", type=int, default=100,
+                        help="end the evaluation of a generation once a bird reaches this score")
+    parser.add_argument("--fitness-threshold", type=float,
+                        help="stop the training once a genome reaches this fitness")
+    parser.add_argument("--render-every", type=int, default=1,
+                        help="only render every n-th frame while training and simulate the others at full speed")
+    parser.add_argument("--render-champion", action="store_true",
+                        help="only render the alive bird with the highest fitness while training")
+    parser.add_argument("--decouple-rendering", action="store_true",
+                        help="train at full speed in a thread and only render the frames the window can keep up with")
     args = parser.parse_args()
 
-    game = Game()
+    if args.play and args.headless:
+        parser.error("-play requires a window and can not be combined with --headless")
+    if args.workers > 1 and not args.headless:
+        parser.error("--workers requires --headless since the workers do not render the game")
+    if args.islands > 1 and not args.headless:
+        parser.error("--islands requires --headless since the islands do not render the game")
+    if args.islands > 1 and args.workers > 1:
+        parser.error("--islands can not be combined with --workers since each island uses its own process")
+    if args.memoize and args.seed is None:
+        parser.error("--memoize requires --seed since the fitness depends on the pipe track")
+    if args.render_every < 1:
+        parser.error("--render-every has to be at least 1")
+    if args.migration_interval < 1:
+        parser.error("--migration-interval has to be at least 1")
+
+    game = Game(args.headless, args.seed, args.max_frames, args.max_score, args.render_every, args.render_champion,
+                args.decouple_rendering)
     if args.play:
         # Let the player play flappy bird
         print("Score: {}".format(game.play_game()))
     else:
         # Let the AI play flappy bird
-        game.create_population()
+        if args.islands > 1:
+            champion = game.create_islands(args.islands, args.migration_interval, args.migrants, args.migration_dir,
+                                           args.memoize, args.fitness_threshold)
+        else:
+            champion = game.create_population(args.workers, args.memoize, args.fitness_threshold,
+                                              args.compatibility_cache)
+        print("Fitness of the best genome: {}".format(champion.fitness))
@@ -1,6 +1,9 @@
+from typing import Optional
+
 import pygame
 
 from flappy_bird.bird import Bird
+from flappy_bird.masks import get_mask, overlaps
 
 
 class Ground:
@@ -16,13 +19,20 @@ class Ground:
         and the ground
         """
         bird_mask = bird.get_mask()
-        ground_mask = pygame.mask.from_surface(self.ground_img)
+        ground_mask = get_mask(self.ground_img)
 
         offset = (bird.pos_x, round(bird.pos_y - self.pos_y))
 
-        is_overlapping: bool = ground_mask.overlap(bird_mask, offset) is not None
+        is_overlapping: bool = overlaps(ground_mask, bird_mask, offset)
         is_too_high = bird.pos_y <= 0
         return is_overlapping or is_too_high
 
-    def draw(self, window: pygame.Surface):
-        window.blit(self.ground_img, (0, self.pos_y))
+    def draw(self, window: pygame.Surface, area: Optional[pygame.Rect] = None):
+        """Draw the ground or only the part of it inside the area of the window"""
+        if area is None:
+            window.blit(self.ground_img, (0, self.pos_y))
+            return
+
+        area = area.clip(self.ground_img.get_rect(topleft=(0, self.pos_y)))
+        if area:
+            window.blit(self.ground_img, area, area.move(0, -self.pos_y))
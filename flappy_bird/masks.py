@@ -0,0 +1,30 @@
+from typing import Tuple
+from weakref import WeakKeyDictionary
+
+import pygame
+
+# The images of the game never change, so their masks are only computed once
+_masks: "WeakKeyDictionary[pygame.Surface, pygame.Mask]" = WeakKeyDictionary()
+
+
+def get_mask(surface: pygame.Surface) -> pygame.Mask:
+    """Return the cached mask of an image"""
+    mask = _masks.get(surface)
+    if mask is None:
+        mask = pygame.mask.from_surface(surface)
+        _masks[surface] = mask
+    return mask
+
+
+def overlaps(mask: pygame.Mask, other_mask: pygame.Mask, offset: Tuple[int, int]) -> bool:
+    """
+    Check for pixel perfect collision of two masks like Mask.overlap, but reject
+    masks whose bounding boxes do not intersect before comparing the pixels
+    """
+    offset_x, offset_y = offset
+    width, height = mask.get_size()
+    other_width, other_height = other_mask.get_size()
+
+    if offset_x >= width or offset_x <= -other_width or offset_y >= height or offset_y <= -other_height:
+        return False
+    return mask.overlap(other_mask, offset) is not None
@@ -1,8 +1,10 @@
 import random
+from typing import List
 
 import pygame
 
 from flappy_bird.bird import Bird
+from flappy_bird.masks import get_mask, overlaps
 
 
 class Pipe:
@@ -11,16 +13,26 @@ class Pipe:
     MIN_HEIGHT = 50
     MAX_HEIGHT = 450
 
-    def __init__(self, pos_x, pipe_img):
-        self.pos_x = pos_x
-
+    def __init__(self, pos_x, pipe_img, height=None, top_img=None):
+        """
+        :param height: The height of the gap between the top and bottom pipe,
+        a random height if not given
+        :param top_img: The flipped pipe image, which can be shared between pipes
+        """
         self.bottom_img: pygame.Surface = pipe_img
-        self.top_img: pygame.Surface = pygame.transform.flip(pipe_img, False, True)
+        self.top_img: pygame.Surface = top_img
+        if self.top_img is None:
+            self.top_img = pygame.transform.flip(pipe_img, False, True)
 
-        height = random.randrange(self.MIN_HEIGHT, self.MAX_HEIGHT)
+        if height is None:
+            height = random.randrange(self.MIN_HEIGHT, self.MAX_HEIGHT)
+        self.reset(pos_x, height)
+
+    def reset(self, pos_x, height):
+        """Place the pipe at pos_x with a new gap height to reuse it"""
+        self.pos_x = pos_x
         self.bottom_y = height + self.SPACE
         self.top_y = height - self.top_img.get_height()
-
         self.passed = False
 
     def is_colliding(self, bird: Bird) -> bool:
@@ -29,16 +41,14 @@ class Pipe:
         and the pipes using masks
         """
         bird_mask = bird.get_mask()
-        bottom_pipe_mask = pygame.mask.from_surface(self.bottom_img)
-        top_pipe_mask = pygame.mask.from_surface(self.top_img)
+        bottom_pipe_mask = get_mask(self.bottom_img)
+        top_pipe_mask = get_mask(self.top_img)
 
         bottom_offset = (self.pos_x - bird.pos_x, round(self.bottom_y - bird.pos_y))
         top_offset = (self.pos_x - bird.pos_x, round(self.top_y - bird.pos_y))
 
-        is_bottom_overlapping: bool = \
-            bird_mask.overlap(bottom_pipe_mask, bottom_offset) is not None
-        is_top_overlapping: bool = \
-            bird_mask.overlap(top_pipe_mask, top_offset) is not None
+        is_bottom_overlapping: bool = overlaps(bird_mask, bottom_pipe_mask, bottom_offset)
+        is_top_overlapping: bool = overlaps(bird_mask, top_pipe_mask, top_offset)
 
         return is_bottom_overlapping or is_top_overlapping
 
@@ -49,6 +59,7 @@ class Pipe:
         """
         self.pos_x -= self.VELOCITY
 
-    def draw(self, window: pygame.Surface):
-        window.blit(self.bottom_img, (self.pos_x, self.bottom_y))
-        window.blit(self.top_img, (self.pos_x, self.top_y))
+    def draw(self, window: pygame.Surface) -> List[pygame.Rect]:
+        """Draw the pipe and return the areas which were drawn"""
+        return [window.blit(self.bottom_img, (self.pos_x, self.bottom_y)),
+                window.blit(self.top_img, (self.pos_x, self.top_y))]
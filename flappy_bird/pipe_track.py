@@ -0,0 +1,21 @@
+import numpy as np
+
+from flappy_bird.pipe import Pipe
+
+
+class PipeTrack:
+    """
+    The course of a game: the gap heights of all pipes, drawn once from a seed.
+    Games with the same seed fly through the same pipes, no matter in which
+    process, generation or run they are played.
+    """
+    LENGTH = 10000
+
+    def __init__(self, seed):
+        self.seed = seed
+        rng = np.random.default_rng(seed)
+        self.heights: np.ndarray = rng.integers(Pipe.MIN_HEIGHT, Pipe.MAX_HEIGHT, self.LENGTH)
+
+    def height(self, index) -> int:
+        """Return the gap height of the pipe at index, the track repeats after LENGTH pipes"""
+        return int(self.heights[index % self.LENGTH])
@@ -0,0 +1,236 @@
+from __future__ import annotations
+import random
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pygame
+
+from flappy_bird.bird import Bird
+from flappy_bird.ground import Ground
+from flappy_bird.masks import get_mask
+from flappy_bird.pipe import Pipe
+from flappy_bird.pipe_track import PipeTrack
+
+
+class _OverlapTable:
+    """
+    Pixel perfect overlap of two masks for a fixed horizontal offset,
+    precomputed for every vertical offset at which the masks can overlap
+    """
+
+    def __init__(self, mask: pygame.Mask, other_mask: pygame.Mask, offset_x):
+        height = mask.get_size()[1]
+        other_height = other_mask.get_size()[1]
+
+        self.min_offset_y = 1 - other_height
+        self.table = np.array(
+            [mask.overlap(other_mask, (offset_x, offset_y)) is not None
+             for offset_y in range(self.min_offset_y, height)], dtype=bool)
+
+    def overlaps(self, offsets_y: np.ndarray) -> np.ndarray:
+        """Return for each vertical offset if the masks overlap"""
+        indices = offsets_y - self.min_offset_y
+        inside = (indices >= 0) & (indices < len(self.table))
+
+        result = np.zeros(len(offsets_y), dtype=bool)
+        result[inside] = self.table[indices[inside]]
+        return result
+
+
+class WorldSnapshot:
+    """
+    The positions of the drawn birds and of the pipes of one frame, which
+    can be drawn while the world is already moved on in another thread
+    """
+
+    def __init__(self, world: World):
+        drawn_birds = world.alive if world.drawn_birds is None else world.drawn_birds & world.alive
+        self.bird_img: pygame.Surface = world.bird_img
+        self.pipe_img: pygame.Surface = world.pipe_img
+        self.top_pipe_img: pygame.Surface = world.top_pipe_img
+        self.bird_x = world.bird_x
+        self.pos_y: np.ndarray = world.pos_y[drawn_birds]
+        self.pipes: List[Tuple[int, int, int]] = [(pipe.pos_x, pipe.top_y, pipe.bottom_y) for pipe in world.pipes]
+        self.num_alive = world.num_alive
+
+    def draw(self, window: pygame.Surface) -> List[pygame.Rect]:
+        """Draw the birds and the pipes and return the areas which were drawn"""
+        rects = [window.blit(self.bird_img, (self.bird_x, pos_y)) for pos_y in self.pos_y.tolist()]
+
+        for pos_x, top_y, bottom_y in self.pipes:
+            rects.append(window.blit(self.pipe_img, (pos_x, bottom_y)))
+            rects.append(window.blit(self.top_pipe_img, (pos_x, top_y)))
+        return rects
+
+
+class World:
+    """
+    The state of a whole population of birds, stored as a structure of arrays.
+    All birds fly at the same horizontal position through the same pipes, so
+    every bird can be moved and checked for collisions at once.
+    """
+    # a new pipe is only spawned while there are less than two pipes
+    MAX_PIPES = 2
+
+    def __init__(
+            self,
+            bird_img: pygame.Surface,
+            pipe_img: pygame.Surface,
+            ground: Ground,
+            bird_x,
+            bird_y,
+            pipe_start_x,
+            space_between_pipes
+    ):
+        self.bird_img: pygame.Surface = bird_img
+        self.pipe_img: pygame.Surface = pipe_img
+        self.ground: Ground = ground
+        self.bird_x = bird_x
+        self.bird_y = bird_y
+        self.pipe_start_x = pipe_start_x
+        self.space_between_pipes = space_between_pipes
+
+        self.pos_y = np.empty(0, dtype=float)
+        self.time_since_jump = np.empty(0, dtype=int)
+        self.alive = np.empty(0, dtype=bool)
+        # the birds which are drawn, all alive birds if not set
+        self.drawn_birds: Optional[np.ndarray] = None
+        self.pipes: List[Pipe] = []
+        self.track: Optional[PipeTrack] = None
+        self._num_spawned_pipes = 0
+
+        # the pipes are reused instead of created for every spawn and share the flipped image
+        self.top_pipe_img: pygame.Surface = pygame.transform.flip(pipe_img, False, True)
+        self._free_pipes: List[Pipe] = [
+            Pipe(pipe_start_x, pipe_img, Pipe.MIN_HEIGHT, self.top_pipe_img) for _ in range(self.MAX_PIPES)]
+
+        # The birds only move vertically, so the pixel perfect collisions only
+        # depend on the vertical offset for a given horizontal offset
+        self._bird_mask = get_mask(bird_img)
+        self._bottom_pipe_mask = get_mask(pipe_img)
+        self._top_pipe_mask = get_mask(self.top_pipe_img)
+        self._ground_table = _OverlapTable(get_mask(ground.ground_img), self._bird_mask, bird_x)
+        # tables of the bottom and the top pipe by the horizontal offset of the pipe
+        self._pipe_tables: Dict[int, Tuple[_OverlapTable, _OverlapTable]] = {}
+
+    @property
+    def num_alive(self) -> int:
+        return int(np.count_nonzero(self.alive))
+
+    def reset(self, num_birds, seed=None):
+        """
+        Place num_birds alive birds at the start position in front of a new pipe
+        :param seed: Seed of the pipe track, so worlds with the same seed have the same pipes.
+        A random seed is drawn from the global random generator if not given.
+        """
+        self.pos_y = np.full(num_birds, self.bird_y, dtype=float)
+        self.time_since_jump = np.zeros(num_birds, dtype=int)
+        self.alive = np.ones(num_birds, dtype=bool)
+        self.drawn_birds = None
+
+        if seed is None:
+            seed = random.randrange(2 ** 32)
+        if self.track is None or self.track.seed != seed:
+            self.track = PipeTrack(seed)
+
+        self._free_pipes.extend(self.pipes)
+        self.pipes = []
+        self._num_spawned_pipes = 0
+        self._spawn_pipe()
+
+    def update_pipes(self) -> Tuple[Pipe, bool]:
+        """
+        Spawn new pipes, remove the pipes which left the window and check if
+        the birds passed a pipe in this frame.
+        Return the nearest pipe in front of the birds and whether a pipe was passed.
+        """
+        passed_pipe = False
+
+        for pipe in self.pipes:
+            if pipe.passed:
+                continue
+
+            if pipe.pos_x <= self.pipe_start_x - self.space_between_pipes and len(self.pipes) < self.MAX_PIPES:
+                self._spawn_pipe()
+
+            if pipe.pos_x + self.pipe_img.get_width() <= self.bird_x:
+                pipe.passed = True
+                passed_pipe = True
+
+        if self.pipes[0].passed and self.pipes[0].pos_x + self.pipe_img.get_width() <= 0:
+            self._free_pipes.append(self.pipes.pop(0))
+
+        front_pipe = self.pipes[0] if not self.pipes[0].passed else self.pipes[1]
+        return front_pipe, passed_pipe
+
+    def check_collisions(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Return which alive birds collide with a pipe and which with the ground"""
+        pipe_collisions = np.zeros(len(self.alive), dtype=bool)
+        alive_indices = np.flatnonzero(self.alive)
+        pos_y = self.pos_y[alive_indices]
+
+        for pipe in self.pipes:
+            offset_x = pipe.pos_x - self.bird_x
+            # the bird and the pipe can not overlap if they are horizontally apart
+            if offset_x >= self.bird_img.get_width() or offset_x <= -self.pipe_img.get_width():
+                continue
+
+            bottom_table, top_table = self._get_pipe_tables(offset_x)
+            is_colliding = \
+                bottom_table.overlaps(np.rint(pipe.bottom_y - pos_y).astype(int)) | \
+                top_table.overlaps(np.rint(pipe.top_y - pos_y).astype(int))
+            pipe_collisions[alive_indices[is_colliding]] = True
+
+        ground_collisions = np.zeros(len(self.alive), dtype=bool)
+        ground_collisions[alive_indices] = \
+            self._ground_table.overlaps(np.rint(pos_y - self.ground.pos_y).astype(int)) | (pos_y <= 0)
+
+        return pipe_collisions, ground_collisions
+
+    def observations(self, front_pipe: Pipe) -> np.ndarray:
+        """
+        Return the height of each bird and its distance to the top and bottom
+        part of the front pipe
+        """
+        return np.stack(
+            [self.pos_y, self.pos_y - front_pipe.top_y, self.pos_y - front_pipe.bottom_y], axis=1)
+
+    def kill(self, birds: np.ndarray):
+        self.alive &= ~birds
+
+    def jump(self, birds: np.ndarray):
+        self.time_since_jump[birds & self.alive] = 0
+
+    def move(self):
+        """Move all alive birds with the same projectile motion as Bird.move and move the pipes"""
+        alive = self.alive
+        self.time_since_jump[alive] += 1
+        time_since_jump = self.time_since_jump[alive]
+
+        displacement = Bird.VELOCITY * time_since_jump + 0.5 * Bird.GRAVITY * time_since_jump ** 2
+        self.pos_y[alive] += np.minimum(displacement, Bird.MAX_DISPLACEMENT)
+
+        for pipe in self.pipes:
+            pipe.move()
+
+    def snapshot(self) -> WorldSnapshot:
+        return WorldSnapshot(self)
+
+    def draw(self, window: pygame.Surface) -> List[pygame.Rect]:
+        """Draw the birds and the pipes and return the areas which were drawn"""
+        return self.snapshot().draw(window)
+
+    def _spawn_pipe(self):
+        """Place a free pipe with the next height of the track at the start position"""
+        pipe = self._free_pipes.pop()
+        pipe.reset(self.pipe_start_x, self.track.height(self._num_spawned_pipes))
+        self._num_spawned_pipes += 1
+        self.pipes.append(pipe)
+
+    def _get_pipe_tables(self, offset_x) -> Tuple[_OverlapTable, _OverlapTable]:
+        tables = self._pipe_tables.get(offset_x)
+        if tables is None:
+            tables = (_OverlapTable(self._bird_mask, self._bottom_pipe_mask, offset_x),
+                      _OverlapTable(self._bird_mask, self._top_pipe_mask, offset_x))
+            self._pipe_tables[offset_x] = tables
+        return tables
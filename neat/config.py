@@ -16,7 +16,9 @@ class Config:
             species_difference,
             genomes_to_save,
             min_specie_size,
-            activation_function
+            activation_function,
+            compatibility_cache_size=0,
+            fitness_threshold=None
     ):
         """
         :param change_weight_mutation:
@@ -49,6 +51,12 @@ class Config:
         The minimum numbers of genomes per specie
         :param activation_function:
         Which activation to use for the neural net
+        :param compatibility_cache_size:
+        The maximum number of cached compatibility scores, each takes around 250 bytes.
+        0 disables the cache, which is faster unless many genomes survive unchanged
+        since the children of each generation are new genomes
+        :param fitness_threshold:
+        Stop the evolution once a genome reaches this fitness, None to run all generations
         """
         self.change_weight_mutation = change_weight_mutation
         self.replace_weight_mutation = replace_weight_mutation
@@ -65,3 +73,5 @@ class Config:
         self.genomes_to_save = genomes_to_save
         self.min_specie_size = min_specie_size
         self.activation_function = activation_function
+        self.compatibility_cache_size = compatibility_cache_size
+        self.fitness_threshold = fitness_threshold
@@ -1,5 +1,4 @@
-from copy import deepcopy
-from typing import Optional
+from typing import Callable, List, Optional, Tuple, TypeVar
 
 import neat.utils as utils
 from neat.genotype.genome import Genome
@@ -7,10 +6,15 @@ from neat.genotype.genome_edge import GenomeEdge
 from neat.genotype.genome_node import GenomeNode
 from neat.config import Config
 
+Gene = TypeVar("Gene", GenomeNode, GenomeEdge)
+
 
 def crossover(parent_a: Genome, parent_b: Genome, config: Config) -> Genome:
     """
     Crossover two Genomes instances
+    The genes of the parents are aligned by a single merge over their innovation
+    numbers and node ids. The child gets the structure of the better parent, which is
+    a valid feed forward net, so the inherited edges do not have to be checked again.
     :param parent_a:
     :param parent_b:
     :param config:
@@ -20,38 +24,54 @@ def crossover(parent_a: Genome, parent_b: Genome, config: Config) -> Genome:
     child = Genome()
     best_parent, other_parent = _order_parents(parent_a, parent_b)
 
-    for edge in best_parent.edges:
-        matching_edge: Optional[GenomeEdge] = \
-            other_parent.get_edge_by_innovation_num(edge.innovation_num)
+    node_pairs = _merge(best_parent.nodes, other_parent.nodes, lambda node: node.id)
+    for node in _inherit(node_pairs):
+        child.add_node(GenomeNode(node.id, node.type, node.bias, node.activation))
 
-        # Matching genes are inherited randomly
-        if matching_edge is not None and utils.rand_bool():
-            child_edge = deepcopy(matching_edge)
-        # Disjoint and excess genes are taken from the better fitting parent
-        else:
-            child_edge = deepcopy(edge)
+    edge_pairs = _merge(best_parent.edges, other_parent.edges, lambda edge: edge.innovation_num)
+    for (best_edge, _), edge in zip(edge_pairs, _inherit(edge_pairs)):
+        is_enabled = edge.is_enabled
+        # A disabled gene of the other parent is enabled if it is enabled in the better parent,
+        # otherwise it gets re enabled at the reenable rate
+        if not is_enabled:
+            is_enabled = best_edge.is_enabled or utils.rand_uni_val() < config.reenable_connection_rate
+
+        child.add_edge(GenomeEdge(edge.from_id, edge.to_id, is_enabled, edge.weight, edge.innovation_num))
+
+    return child
 
-        if not child_edge.is_enabled:
-            if utils.rand_uni_val() < config.reenable_connection_rate \
-                    or best_parent.get_edge_by_innovation_num(edge.innovation_num):
-                child_edge.is_enabled = True
 
-        child.create_new_edge(
-            child_edge.from_id, child_edge.to_id, child_edge.is_enabled, child_edge.weight)
+def _merge(genes: List[Gene], other_genes: List[Gene], key: Callable[[Gene], int]) -> List[Tuple[Gene, Optional[Gene]]]:
+    """Pair each gene with the matching gene of the other parent by merging the genes sorted by key"""
+    genes = sorted(genes, key=key)
+    other_genes = sorted(other_genes, key=key)
 
-    for node in best_parent.nodes:
-        matching_node: Optional[GenomeNode] = other_parent.get_node_by_id(node.id)
+    pairs = []
+    other_index = 0
+    for gene in genes:
+        while other_index < len(other_genes) and key(other_genes[other_index]) < key(gene):
+            other_index += 1
 
-        # Matching genes are inherited randomly
-        if matching_node is not None and utils.rand_bool():
-            child_node = deepcopy(matching_node)
-        # Disjoint and excess genes are taken from the better fitting parent
+        if other_index < len(other_genes) and key(other_genes[other_index]) == key(gene):
+            pairs.append((gene, other_genes[other_index]))
+            other_index += 1
         else:
-            child_node = deepcopy(node)
+            pairs.append((gene, None))
+    return pairs
 
-        child.create_new_node(child_node.type, child_node.id)
 
-    return child
+def _inherit(pairs: List[Tuple[Gene, Optional[Gene]]]) -> List[Gene]:
+    """
+    Matching genes are inherited randomly.
+    Disjoint and excess genes are taken from the better fitting parent.
+    """
+    matching = [index for index, (_, other_gene) in enumerate(pairs) if other_gene is not None]
+    inherited = [gene for gene, _ in pairs]
+
+    for index, from_other in zip(matching, utils.rng.random(len(matching)) < 0.5):
+        if from_other:
+            inherited[index] = pairs[index][1]
+    return inherited
 
 
 def _order_parents(genome_a: Genome, genome_b: Genome):
@@ -0,0 +1,61 @@
+from collections import OrderedDict
+from typing import Callable, List, Tuple
+
+from neat.config import Config
+from neat.genotype.genome import Genome
+
+# Sets the fitness of each of the genomes
+EvaluationFunction = Callable[[List[Genome], Config], None]
+
+
+class FitnessMemo:
+    """
+    Evaluation function which remembers the fitnesses of genomes on a deterministic course.
+    Genomes which are evaluated again unchanged, e.g. the elites of the last generation,
+    get their remembered fitness instead of being played again.
+    The fitnesses are keyed by the content hash of the genome and the seed of the course.
+    """
+
+    def __init__(self, evaluation_function: EvaluationFunction, seed, max_size=10000):
+        """
+        :param evaluation_function: Evaluates the genomes, which has to give the same
+        fitness for the same genes on the course of the seed
+        :param seed: The seed of the course of all generations
+        :param max_size: The maximum number of remembered fitnesses, the least recently
+        used are forgotten first
+        """
+        if seed is None:
+            raise ValueError("The fitnesses can only be remembered on a seeded course")
+
+        self.evaluation_function: EvaluationFunction = evaluation_function
+        self.seed = seed
+        self.max_size = max_size
+        self.fitnesses: OrderedDict[Tuple[int, int], float] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __call__(self, genomes: List[Genome], config: Config):
+        unknown_genomes = []
+        for genome in genomes:
+            key = (genome.content_hash(), self.seed)
+            fitness = self.fitnesses.get(key)
+            if fitness is None:
+                unknown_genomes.append(genome)
+                continue
+
+            genome.fitness = fitness
+            self.fitnesses.move_to_end(key)
+        self.hits += len(genomes) - len(unknown_genomes)
+        self.misses += len(unknown_genomes)
+
+        if not unknown_genomes:
+            return
+
+        self.evaluation_function(unknown_genomes, config)
+        for genome in unknown_genomes:
+            self.fitnesses[(genome.content_hash(), self.seed)] = genome.fitness
+        while len(self.fitnesses) > self.max_size:
+            self.fitnesses.popitem(last=False)
+
+    def __str__(self):
+        return "hits: {}, misses: {}, size: {}".format(self.hits, self.misses, len(self.fitnesses))
@@ -1,4 +1,10 @@
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+import numpy as np
+
 from neat.genotype.genome import Genome
+from neat.genotype.genome_store import GenomeStore
 
 
 def calculate_compatibility_score(genome_a: Genome, genome_b: Genome) -> float:
@@ -44,3 +50,118 @@ def _calculate_edge_distance(genome_a: Genome, genome_b: Genome) -> float:
             num_disjoint += 1
 
     return (edge_distance + num_disjoint) / max(len(genome_a.edges), len(genome_b.edges))
+
+
+class AlignedGenomes:
+    """
+    The biases and weights of many genomes aligned in dense arrays, with one row per
+    genome and one column per node id and innovation number.
+    The compatibility scores of all genomes with one genome are calculated at once
+    with the same formula as calculate_compatibility_score.
+    """
+
+    def __init__(self, genomes: List[Genome]):
+        store = GenomeStore.pack(dict(enumerate(genomes)))
+        self.biases, self.has_nodes = AlignedGenomes._align(
+            len(genomes), store.node_genomes, store.node_ids, store.biases)
+
+        # the registry also numbers the edges of extinct genomes, so only the
+        # innovation numbers present in these genomes get a column
+        _, edge_columns = np.unique(store.innovation_nums, return_inverse=True)
+        self.weights, self.has_edges = AlignedGenomes._align(
+            len(genomes), store.edge_genomes, edge_columns.reshape(-1), store.weights)
+
+        self.num_nodes = self.has_nodes.sum(axis=1)
+        self.num_edges = self.has_edges.sum(axis=1)
+
+    def compatibility_scores(self, index, rows=None) -> np.ndarray:
+        """
+        Return the compatibility scores of all genomes with the genome at index
+        :param rows: Only calculate the scores of the genomes at these indices
+        """
+        if rows is None:
+            rows = slice(None)
+        node_distance = AlignedGenomes._distance(
+            self.biases[rows], self.has_nodes[rows], self.num_nodes[rows], self.biases[index],
+            self.has_nodes[index], self.num_nodes[index])
+        edge_distance = AlignedGenomes._distance(
+            self.weights[rows], self.has_edges[rows], self.num_edges[rows], self.weights[index],
+            self.has_edges[index], self.num_edges[index])
+        return node_distance + edge_distance
+
+    @staticmethod
+    def _align(num_genomes, genomes: np.ndarray, columns: np.ndarray, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Scatter the gene values into a dense array and return it with the mask of the existing genes"""
+        num_columns = int(columns.max()) + 1 if len(columns) else 0
+        aligned = np.zeros((num_genomes, num_columns))
+        exists = np.zeros((num_genomes, num_columns), dtype=bool)
+        aligned[genomes, columns] = values
+        exists[genomes, columns] = True
+        return aligned, exists
+
+    @staticmethod
+    def _distance(
+            values: np.ndarray, exists: np.ndarray, num_genes: np.ndarray,
+            other_values: np.ndarray, other_exists: np.ndarray, other_num_genes
+    ) -> np.ndarray:
+        matching = exists & other_exists
+        distance = np.abs(values - other_values).sum(axis=1, where=matching)
+
+        num_matching = matching.sum(axis=1)
+        num_disjoint = num_genes + other_num_genes - 2 * num_matching
+        return (distance + num_disjoint) / np.maximum(num_genes, other_num_genes)
+
+
+class CompatibilityCache:
+    """
+    Least recently used cache of the compatibility scores of genome pairs.
+    The scores are keyed by the versions of the genomes, so the scores of a
+    genome are not used anymore once it changed.
+    The counters describe the lookups since the last reset, e.g. of one speciation.
+    """
+
+    def __init__(self, max_size):
+        """:param max_size: The maximum number of cached scores, 0 disables the cache"""
+        self.max_size = max_size
+        self.scores: OrderedDict[Tuple[int, int], float] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """The share of the lookups which did not have to calculate the score"""
+        return self.hits / max(1, self.hits + self.misses)
+
+    def reset_counters(self):
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, genome_a: Genome, genome_b: Genome) -> Optional[float]:
+        key = CompatibilityCache._key(genome_a, genome_b)
+        score = self.scores.get(key)
+        if score is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self.scores.move_to_end(key)
+        return score
+
+    def put(self, genome_a: Genome, genome_b: Genome, score: float):
+        if self.max_size <= 0:
+            return
+
+        key = CompatibilityCache._key(genome_a, genome_b)
+        self.scores[key] = score
+        self.scores.move_to_end(key)
+        while len(self.scores) > self.max_size:
+            self.scores.popitem(last=False)
+
+    def __str__(self):
+        return "hits: {}, misses: {}, hit rate: {:.1%}, size: {}" \
+            .format(self.hits, self.misses, self.hit_rate, len(self.scores))
+
+    @staticmethod
+    def _key(genome_a: Genome, genome_b: Genome) -> Tuple[int, int]:
+        # the score is symmetric
+        return min(genome_a.version, genome_b.version), max(genome_a.version, genome_b.version)
@@ -1,6 +1,7 @@
 from __future__ import annotations
 import random
-from typing import Optional, List
+import uuid
+from typing import Dict, Hashable, KeysView, Optional, List, Set
 
 from neat.genotype.genome_edge import GenomeEdge
 from neat.genotype.genome_node import GenomeNode
@@ -12,10 +13,51 @@ class Genome:
         self.edges: List[GenomeEdge] = []
         self.nodes: List[GenomeNode] = []
         self.fitness = None
-        # save the node ids and the innovation nums for faster lookup
-        # while calculating the edge distance
-        self.node_ids = set()
-        self.innovation_nums = set()
+        # index the nodes by their id and the edges by their innovation num for
+        # constant time lookups during crossover and the compatibility calculation
+        self._nodes_by_id: Dict[int, GenomeNode] = {}
+        self._edges_by_innovation_num: Dict[int, GenomeEdge] = {}
+        # successors of each node by all (also disabled) edges for the connection and cycle checks
+        self._successors: Dict[int, Set[int]] = {}
+        self._version: Optional[int] = None
+        # values computed from the current version, e.g. the compiled neural net
+        self.cache: Dict[Hashable, object] = {}
+
+    @property
+    def version(self) -> int:
+        """
+        Identify the current content of the genome, e.g. to cache results computed from it.
+        The version is unique across processes and is renewed after each change of the genome.
+        """
+        if self._version is None:
+            self._version = uuid.uuid4().int
+        return self._version
+
+    def changed(self):
+        """Mark the genome as changed, which has to be called after modifying any of its genes"""
+        self._version = None
+        self.cache.clear()
+
+    def content_hash(self) -> int:
+        """
+        Hash of the genes, which is equal for genomes with the same genes in the same order.
+        The hash is only comparable within one process.
+        """
+        content_hash = self.cache.get("content_hash")
+        if content_hash is None:
+            content_hash = hash((
+                tuple((node.id, node.type, node.bias, node.activation) for node in self.nodes),
+                tuple((edge.from_id, edge.to_id, edge.is_enabled, edge.weight) for edge in self.edges)))
+            self.cache["content_hash"] = content_hash
+        return content_hash
+
+    @property
+    def node_ids(self) -> KeysView[int]:
+        return self._nodes_by_id.keys()
+
+    @property
+    def innovation_nums(self) -> KeysView[int]:
+        return self._edges_by_innovation_num.keys()
 
     def mutate_add_edge(self):
         """Add a new edge between two unconnected nodes with a random weight"""
@@ -41,6 +83,7 @@ class Genome:
         """
         edge_to_split: GenomeEdge = random.choice(self.edges)
         edge_to_split.is_enabled = False
+        self.changed()
 
         new_node = self.create_new_node("hidden")
         self.create_new_edge(edge_to_split.from_id, new_node.id, weight=1)
@@ -60,8 +103,7 @@ class Genome:
         if next_id is None:
             next_id = len(self.nodes)
         new_node = GenomeNode(next_id, node_type)
-        self.nodes.append(new_node)
-        self.node_ids.add(next_id)
+        self.add_node(new_node)
         return new_node
 
     def create_new_edge(self, from_id, to_id, is_enabled=True, weight=None) -> bool:
@@ -69,29 +111,32 @@ class Genome:
         Create a new edge in the graph.
         Return True if the new edge is valid and could be added, otherwise return False.
         """
-        new_edge = GenomeEdge(from_id, to_id, is_enabled)
-
-        if weight is not None:
-            new_edge.weight = weight
-
-        if self._is_valid_new_edge(from_id, to_id):
-            self.edges.append(new_edge)
-            self.innovation_nums.add(new_edge.innovation_num)
-            return True
-        return False
+        # only valid edges get an innovation number and a random weight
+        if not self._is_valid_new_edge(from_id, to_id):
+            return False
+
+        self.add_edge(GenomeEdge(from_id, to_id, is_enabled, weight))
+        return True
+
+    def add_node(self, node: GenomeNode):
+        """Add an existing node to the graph"""
+        self.nodes.append(node)
+        self._nodes_by_id.setdefault(node.id, node)
+        self.changed()
+
+    def add_edge(self, edge: GenomeEdge):
+        """Add an existing edge to the graph without checking if it is a valid new edge"""
+        self.edges.append(edge)
+        self._edges_by_innovation_num[edge.innovation_num] = edge
+        self._successors.setdefault(edge.from_id, set()).add(edge.to_id)
+        self.changed()
 
     def get_node_by_id(self, target_id) -> Optional[GenomeNode]:
-        for node in self.nodes:
-            if node.id == target_id:
-                return node
-        return None
+        return self._nodes_by_id.get(target_id)
 
     def get_edge_by_innovation_num(self, innovation_num) -> Optional[GenomeEdge]:
         """Return the edge by its innovation number"""
-        for edge in self.edges:
-            if edge.innovation_num == innovation_num:
-                return edge
-        return None
+        return self._edges_by_innovation_num.get(innovation_num)
 
     def _is_valid_new_edge(self, from_id, to_id) -> bool:
         """Check if a new edge is a valid edge for a feed forward neural net"""
@@ -100,32 +145,28 @@ class Genome:
 
     def _connection_exists(self, from_id, to_id) -> bool:
         """Check if a given edge already exists in the graph"""
-        for edge in self.edges:
-            if edge.from_id == from_id and edge.to_id == to_id:
-                return True
-        return False
+        return to_id in self._successors.get(from_id, ())
 
     def _creates_cycle(self, from_id, to_id) -> bool:
-        """Check if a given edge creates a cycle in the graph"""
+        """
+        Check if a given edge creates a cycle in the graph, which is the case
+        if from_id is reachable from to_id.
+        The depth first search only visits the nodes behind to_id.
+        """
         if from_id == to_id:
             return True
 
-        visited = set()
-        visited.add(from_id)
-
-        while True:
-            num_added = 0
-
-            for edge in self.edges:
-                if edge.to_id in visited and edge.from_id not in visited:
-                    if edge.from_id == to_id:
-                        return True
+        visited = {to_id}
+        stack = [to_id]
+        while stack:
+            for successor in self._successors.get(stack.pop(), ()):
+                if successor == from_id:
+                    return True
 
-                    visited.add(edge.from_id)
-                    num_added += 1
-
-            if num_added == 0:
-                return False
+                if successor not in visited:
+                    visited.add(successor)
+                    stack.append(successor)
+        return False
 
     def __str__(self):
         ret = "Nodes: "
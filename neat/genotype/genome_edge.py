@@ -1,28 +1,24 @@
-import numpy as np
 import neat.utils as utils
+from neat.genotype.innovation import registry
 
 
 class GenomeEdge:
 
-    def __init__(self, from_id, to_id, is_enabled):
+    def __init__(self, from_id, to_id, is_enabled, weight=None, innovation_num=None):
         self.from_id: int = from_id
         self.to_id: int = to_id
         self.is_enabled: bool = is_enabled
-        self.weight = None
-        self.generate_random_weight()
+        self.weight = weight
+        if self.weight is None:
+            self.generate_random_weight()
         # The innovation number is an unique int to identify an edge between two nodes
         # of different genomes
-        self.innovation_num = self._calculate_innovation_num()
+        self.innovation_num: int = innovation_num
+        if self.innovation_num is None:
+            self.innovation_num = registry.get(from_id, to_id)
 
     def generate_random_weight(self):
-        self.weight = np.random.normal(0, 1)
-
-    def mutate(self):
-        self.weight += utils.rand_uni_val() * utils.pos_or_neg()
-
-    def _calculate_innovation_num(self):
-        """Generate unique innovation number for two nodes by using Cantors pairing function"""
-        return 0.5 * (self.from_id + self.to_id) * (self.from_id + self.to_id + 1) + self.to_id
+        self.weight = utils.rng.normal(0, 1)
 
     def __str__(self):
         return "from: {} to: {} weight: {} enabled: {}" \
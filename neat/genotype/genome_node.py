@@ -1,21 +1,22 @@
-import numpy as np
+from typing import Optional
+
 import neat.utils as utils
 
 
 class GenomeNode:
 
-    def __init__(self, node_id, node_type):
+    def __init__(self, node_id, node_type, bias=None, activation=None):
         self.id: int = node_id
         # node_type is either input, hidden or output
         self.type: str = node_type
-        self.bias = None
-        self.generate_random_bias()
+        # name of the activation function of the node, None uses the one of the config
+        self.activation: Optional[str] = activation
+        self.bias = bias
+        if self.bias is None:
+            self.generate_random_bias()
 
     def generate_random_bias(self):
-        self.bias = np.random.normal(0, 1)
-
-    def mutate(self):
-        self.bias += utils.rand_uni_val() * utils.pos_or_neg()
+        self.bias = utils.rng.normal(0, 1)
 
     def __str__(self):
         return "{0}-{1}, bias: {2}".format(self.id, self.type, self.bias)
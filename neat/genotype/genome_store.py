@@ -0,0 +1,196 @@
+from __future__ import annotations
+from typing import Dict, List
+
+import numpy as np
+
+from neat.genotype.genome import Genome
+from neat.genotype.genome_edge import GenomeEdge
+from neat.genotype.genome_node import GenomeNode
+
+
+class GenomeStore:
+    """
+    Compact representation of a whole population, in which the genes of all genomes
+    live in typed arrays instead of one Python object per gene.
+    The genes of each genome are stored contiguously, so population wide
+    operations can be applied to the arrays at once.
+    """
+    NODE_TYPES = ["input", "hidden", "output"]
+
+    def __init__(
+            self,
+            keys: np.ndarray,
+            fitnesses: np.ndarray,
+            node_genomes: np.ndarray,
+            node_ids: np.ndarray,
+            node_types: np.ndarray,
+            biases: np.ndarray,
+            node_activations: np.ndarray,
+            activation_names: List[str],
+            edge_genomes: np.ndarray,
+            from_ids: np.ndarray,
+            to_ids: np.ndarray,
+            innovation_nums: np.ndarray,
+            weights: np.ndarray,
+            enabled: np.ndarray
+    ):
+        """
+        All node and all edge arrays are sorted by the genome.
+        :param keys: The key of each genome in the population
+        :param fitnesses: The fitness of each genome, NaN if it was not evaluated yet
+        :param node_genomes: Index of the genome of each node
+        :param node_types: Index of the type of each node in NODE_TYPES
+        :param node_activations: Index of the activation function of each node in
+        activation_names, -1 if the node uses the activation function of the config
+        :param edge_genomes: Index of the genome of each edge
+        """
+        self.keys = keys
+        self.fitnesses = fitnesses
+        self.node_genomes = node_genomes
+        self.node_ids = node_ids
+        self.node_types = node_types
+        self.biases = biases
+        self.node_activations = node_activations
+        self.activation_names = activation_names
+        self.edge_genomes = edge_genomes
+        self.from_ids = from_ids
+        self.to_ids = to_ids
+        self.innovation_nums = innovation_nums
+        self.weights = weights
+        self.enabled = enabled
+
+        # the genes of the i-th genome are between offsets[i] and offsets[i + 1]
+        self.node_offsets = np.searchsorted(node_genomes, np.arange(len(keys) + 1))
+        self.edge_offsets = np.searchsorted(edge_genomes, np.arange(len(keys) + 1))
+        self._indices: Dict[int, int] = {key: index for index, key in enumerate(keys.tolist())}
+
+    def __len__(self):
+        return len(self.keys)
+
+    @property
+    def nbytes(self) -> int:
+        """The number of bytes of all gene arrays"""
+        return sum(array.nbytes for array in (
+            self.keys, self.fitnesses, self.node_genomes, self.node_ids, self.node_types, self.biases,
+            self.node_activations, self.edge_genomes, self.from_ids, self.to_ids, self.innovation_nums,
+            self.weights, self.enabled))
+
+    def view(self, key) -> GenomeView:
+        return GenomeView(self, self._indices[key])
+
+    def unpack(self, renumber=False) -> Dict[int, Genome]:
+        """
+        Create a genome object with gene objects for each genome of the store
+        :param renumber: See GenomeView.to_genome
+        """
+        return {key: self.view(key).to_genome(renumber) for key in self.keys.tolist()}
+
+    @staticmethod
+    def pack(population: Dict[int, Genome]) -> GenomeStore:
+        """Move the genes of all genomes of the population into one store"""
+        genomes: List[Genome] = list(population.values())
+        node_types = {node_type: index for index, node_type in enumerate(GenomeStore.NODE_TYPES)}
+
+        nodes = [(index, node) for index, genome in enumerate(genomes) for node in genome.nodes]
+        activation_names = sorted({node.activation for _, node in nodes if node.activation is not None})
+        activations = {name: index for index, name in enumerate(activation_names)}
+        activations[None] = -1
+        edges = [(index, edge) for index, genome in enumerate(genomes) for edge in genome.edges]
+
+        return GenomeStore(
+            np.array(list(population), dtype=np.int64),
+            np.array([np.nan if genome.fitness is None else genome.fitness for genome in genomes], dtype=np.float64),
+            np.array([index for index, _ in nodes], dtype=np.int32),
+            np.array([node.id for _, node in nodes], dtype=np.int32),
+            np.array([node_types[node.type] for _, node in nodes], dtype=np.int8),
+            np.array([node.bias for _, node in nodes], dtype=np.float64),
+            np.array([activations[node.activation] for _, node in nodes], dtype=np.int8),
+            activation_names,
+            np.array([index for index, _ in edges], dtype=np.int32),
+            np.array([edge.from_id for _, edge in edges], dtype=np.int32),
+            np.array([edge.to_id for _, edge in edges], dtype=np.int32),
+            np.array([edge.innovation_num for _, edge in edges], dtype=np.int32),
+            np.array([edge.weight for _, edge in edges], dtype=np.float64),
+            np.array([edge.is_enabled for _, edge in edges], dtype=bool))
+
+
+class GenomeView:
+    """
+    Lightweight view of one genome in a GenomeStore.
+    The genes are slices of the arrays of the store and are not copied.
+    """
+
+    def __init__(self, store: GenomeStore, index):
+        self.store: GenomeStore = store
+        self.index = index
+        self._nodes = slice(store.node_offsets[index], store.node_offsets[index + 1])
+        self._edges = slice(store.edge_offsets[index], store.edge_offsets[index + 1])
+
+    @property
+    def key(self) -> int:
+        return int(self.store.keys[self.index])
+
+    @property
+    def fitness(self):
+        fitness = self.store.fitnesses[self.index]
+        return None if np.isnan(fitness) else float(fitness)
+
+    @property
+    def node_ids(self) -> np.ndarray:
+        return self.store.node_ids[self._nodes]
+
+    @property
+    def node_types(self) -> np.ndarray:
+        return self.store.node_types[self._nodes]
+
+    @property
+    def biases(self) -> np.ndarray:
+        return self.store.biases[self._nodes]
+
+    @property
+    def node_activations(self) -> np.ndarray:
+        return self.store.node_activations[self._nodes]
+
+    @property
+    def from_ids(self) -> np.ndarray:
+        return self.store.from_ids[self._edges]
+
+    @property
+    def to_ids(self) -> np.ndarray:
+        return self.store.to_ids[self._edges]
+
+    @property
+    def innovation_nums(self) -> np.ndarray:
+        return self.store.innovation_nums[self._edges]
+
+    @property
+    def weights(self) -> np.ndarray:
+        return self.store.weights[self._edges]
+
+    @property
+    def enabled(self) -> np.ndarray:
+        return self.store.enabled[self._edges]
+
+    def to_genome(self, renumber=False) -> Genome:
+        """
+        Create a genome with gene objects, e.g. to mutate it
+        :param renumber: Assign the edges the innovation numbers of the registry of this process
+        instead of the stored ones, e.g. for genomes of another process which has its own registry
+        """
+        genome = Genome()
+        genome.fitness = self.fitness
+
+        # the index -1 of the nodes without an own activation function maps to None
+        activation_names = self.store.activation_names + [None]
+        for node_id, node_type, bias, activation in zip(
+                self.node_ids.tolist(), self.node_types.tolist(), self.biases.tolist(),
+                self.node_activations.tolist()):
+            genome.add_node(GenomeNode(
+                node_id, GenomeStore.NODE_TYPES[node_type], bias, activation_names[activation]))
+
+        for from_id, to_id, is_enabled, weight, innovation_num in zip(
+                self.from_ids.tolist(), self.to_ids.tolist(), self.enabled.tolist(), self.weights.tolist(),
+                self.innovation_nums.tolist()):
+            genome.add_edge(GenomeEdge(from_id, to_id, is_enabled, weight, None if renumber else innovation_num))
+
+        return genome
@@ -0,0 +1,36 @@
+from typing import Dict, Tuple
+
+
+class InnovationRegistry:
+    """
+    Assign each edge between two nodes a compact sequential innovation number.
+    Edges between the same nodes get the same number in all genomes, so the genes
+    of different genomes can be aligned by their innovation numbers.
+    """
+
+    def __init__(self):
+        self._innovation_nums: Dict[Tuple[int, int], int] = {}
+
+    def __len__(self):
+        return len(self._innovation_nums)
+
+    def get(self, from_id, to_id) -> int:
+        """Return the innovation number of the edge, a new edge gets the next free number"""
+        key = (from_id, to_id)
+        innovation_num = self._innovation_nums.get(key)
+        if innovation_num is None:
+            innovation_num = len(self._innovation_nums)
+            self._innovation_nums[key] = innovation_num
+        return innovation_num
+
+    def snapshot(self) -> Dict[Tuple[int, int], int]:
+        """Return a copy of the innovation numbers by edge, e.g. to send them to another process"""
+        return dict(self._innovation_nums)
+
+    def restore(self, innovation_nums: Dict[Tuple[int, int], int]):
+        """Replace the innovation numbers by a snapshot, e.g. of the registry of another process"""
+        self._innovation_nums = dict(innovation_nums)
+
+
+# The registry shared by all genomes of the population in this process
+registry = InnovationRegistry()
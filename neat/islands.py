@@ -0,0 +1,203 @@
+import glob
+import multiprocessing
+import os
+import pickle
+import queue
+import time
+import traceback
+import uuid
+from typing import Callable, List, Optional, Tuple
+
+import neat.utils as utils
+from neat.config import Config
+from neat.genotype.genome import Genome
+from neat.genotype.genome_store import GenomeStore
+from neat.population import Population
+
+# Creates the evaluation function of an island in its process, e.g. a game to play
+EvaluationFunctionFactory = Callable[[], Callable[[List[Genome], Config], None]]
+
+
+class QueueTransport:
+    """Exchange the migrants between the island processes of one machine through queues"""
+
+    def __init__(self, num_islands):
+        self.queues = [multiprocessing.Queue() for _ in range(num_islands)]
+        self._stop = multiprocessing.Event()
+
+    def send(self, island, migrants: GenomeStore):
+        self.queues[island].put(migrants)
+
+    def receive(self, island) -> List[GenomeStore]:
+        """Return all migrants which arrived at the island without waiting for more"""
+        migrants = []
+        while True:
+            try:
+                migrants.append(self.queues[island].get_nowait())
+            except queue.Empty:
+                return migrants
+
+    def stop(self):
+        """Signal all islands to stop, e.g. since one of them reached the fitness threshold"""
+        self._stop.set()
+
+    def stopped(self) -> bool:
+        return self._stop.is_set()
+
+    def close(self):
+        """
+        Do not wait for the delivery of the sent migrants when the process ends,
+        since the receiving island may have finished already
+        """
+        for migrants in self.queues:
+            migrants.cancel_join_thread()
+
+
+class DirectoryTransport:
+    """
+    Exchange the migrants through files in a shared directory, so the islands
+    can also run on several machines which share a file system.
+    The files of each run are kept in a subdirectory of the run id, so the
+    unread migrants and the stop signal of an earlier run are not picked up.
+    """
+
+    def __init__(self, path, run_id=None):
+        """
+        :param run_id: A new run id if not given. Islands on several machines
+        have to be given the same run id.
+        """
+        self.run_id = uuid.uuid4().hex if run_id is None else run_id
+        self.path = os.path.join(path, self.run_id)
+        os.makedirs(self.path, exist_ok=True)
+
+    def send(self, island, migrants: GenomeStore):
+        name = "island-{}-{}-{}".format(island, time.time_ns(), uuid.uuid4().hex)
+        temporary_path = os.path.join(self.path, name + ".tmp")
+        with open(temporary_path, "wb") as file:
+            pickle.dump(migrants, file)
+        # the receiver only sees complete files
+        os.replace(temporary_path, os.path.join(self.path, name + ".pkl"))
+
+    def receive(self, island) -> List[GenomeStore]:
+        """Return all migrants which arrived at the island and remove their files"""
+        migrants = []
+        for path in sorted(glob.glob(os.path.join(self.path, "island-{}-*.pkl".format(island)))):
+            with open(path, "rb") as file:
+                migrants.append(pickle.load(file))
+            os.remove(path)
+        return migrants
+
+    def stop(self):
+        """Signal all islands to stop, e.g. since one of them reached the fitness threshold"""
+        open(os.path.join(self.path, "stop"), "w").close()
+
+    def stopped(self) -> bool:
+        return os.path.exists(os.path.join(self.path, "stop"))
+
+    def close(self):
+        pass
+
+
+class IslandModel:
+    """
+    Evolve several independent populations, the islands, in parallel processes.
+    Each island has its own species and reproduces on its own core. Every migration interval
+    an island sends its best genomes to the next island in a ring and takes in the genomes
+    which arrived from the previous island in the meantime, so no island waits for another.
+    Once an island reaches the fitness threshold, all islands stop after their current generation.
+    """
+
+    def __init__(
+            self,
+            config: Config,
+            create_evaluation_function: EvaluationFunctionFactory,
+            num_islands,
+            migration_interval,
+            num_migrants,
+            transport=None,
+            seed=None
+    ):
+        """
+        :param create_evaluation_function: A function which is picklable, i.e. defined at
+        the top level of a module, and which is called once in each island process
+        :param migration_interval: The number of generations between two migrations
+        :param num_migrants: The number of genomes an island sends to the next island
+        :param transport: A QueueTransport by default. With a DirectoryTransport on a shared
+        file system the islands can also be run on several machines by run_island.
+        :param seed: Island i is seeded with seed + i, a random seed per island if not given
+        """
+        self.config: Config = config
+        self.create_evaluation_function: EvaluationFunctionFactory = create_evaluation_function
+        self.num_islands = num_islands
+        self.migration_interval = migration_interval
+        self.num_migrants = num_migrants
+        self.transport = QueueTransport(num_islands) if transport is None else transport
+        self.seed = seed
+
+    def run(self) -> Optional[Genome]:
+        """Evolve all islands in their own process and return the best genome of all islands"""
+        results = multiprocessing.Queue()
+        processes = [multiprocessing.Process(target=self._run_island_process, args=(island, results))
+                     for island in range(self.num_islands)]
+        for process in processes:
+            process.start()
+
+        # receive the results before joining since a process only ends once its result is sent
+        champions: List[Tuple[float, Optional[GenomeStore]]] = []
+        for _ in processes:
+            island, result, error = results.get()
+            if error is not None:
+                for process in processes:
+                    process.terminate()
+                raise RuntimeError("Island {} failed:\n{}".format(island, error))
+            champions.append(result)
+        for process in processes:
+            process.join()
+
+        champion_fitness, champion = max(champions, key=lambda result: result[0])
+        if champion is None:
+            return None
+
+        genome = champion.view(0).to_genome(renumber=True)
+        genome.fitness = champion_fitness
+        return genome
+
+    def run_island(self, island) -> Optional[Genome]:
+        """Evolve the population of one island and return its best genome"""
+        utils.seed(None if self.seed is None else self.seed + island)
+        evaluation_function = self.create_evaluation_function()
+        population = Population.create(self.config)
+
+        while not population.finished and not self.transport.stopped():
+            population.run(evaluation_function, 1)
+            if population.finished:
+                break
+            if population.generation % self.migration_interval != 0:
+                continue
+
+            migrants = GenomeStore.pack(dict(enumerate(population.best_genomes(self.num_migrants))))
+            self.transport.send((island + 1) % self.num_islands, migrants)
+
+            # the innovation numbers of other processes differ from the ones of this process
+            for store in self.transport.receive(island):
+                population.add_immigrants(list(store.unpack(renumber=True).values()))
+
+        fitness_threshold = self.config.fitness_threshold
+        if fitness_threshold is not None and population.champion_fitness >= fitness_threshold:
+            self.transport.stop()
+        return population.champion
+
+    def _run_island_process(self, island, results: multiprocessing.Queue):
+        """Send the champion of the island or the traceback of its error to run"""
+        try:
+            champion = self.run_island(island)
+        except Exception:
+            results.put((island, None, traceback.format_exc()))
+            return
+        finally:
+            self.transport.close()
+
+        if champion is None:
+            results.put((island, (float("-inf"), None), None))
+        else:
+            results.put((island, (champion.fitness, GenomeStore.pack({0: champion})), None))
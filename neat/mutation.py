@@ -1,3 +1,5 @@
+import numpy as np
+
 import neat.utils as utils
 from neat.config import Config
 from neat.genotype.genome import Genome
@@ -11,20 +13,38 @@ def mutate(genome: Genome, config: Config):
     :param genome: The genome to mutate
     :param config: The configuration with the mutation parameters
     """
-    if utils.rand_uni_val() < config.add_node_mutation_rate:
+    add_node_value, add_edge_value = utils.rng.random(2)
+
+    if add_node_value < config.add_node_mutation_rate:
         genome.mutate_add_node()
 
-    if utils.rand_uni_val() < config.add_connection_mutation_rate:
+    if add_edge_value < config.add_connection_mutation_rate:
         genome.mutate_add_edge()
 
-    for node in genome.nodes:
-        if utils.rand_uni_val() < config.change_weight_mutation:
-            node.mutate()
-        if utils.rand_uni_val() < config.replace_weight_mutation:
-            node.generate_random_bias()
-
-    for edge in genome.edges:
-        if utils.rand_uni_val() < config.change_weight_mutation:
-            edge.mutate()
-        if utils.rand_uni_val() < config.replace_weight_mutation:
-            edge.generate_random_weight()
+    biases = mutate_values(np.array([node.bias for node in genome.nodes], dtype=float), config)
+    for node, bias in zip(genome.nodes, biases.tolist()):
+        node.bias = bias
+
+    weights = mutate_values(np.array([edge.weight for edge in genome.edges], dtype=float), config)
+    for edge, weight in zip(genome.edges, weights.tolist()):
+        edge.weight = weight
+
+    genome.changed()
+
+
+def mutate_values(values: np.ndarray, config: Config) -> np.ndarray:
+    """
+    Mutate weights or biases at once. Each value is perturbed by a uniform value in [-1, 1]
+    and replaced by a new value like GenomeEdge.generate_random_weight at the rates of the config
+    :param values: The weights or biases to mutate
+    :param config: The configuration with the mutation parameters
+    :return: The mutated values
+    """
+    change_values, replace_values, perturbations = utils.rng.random((3, len(values)))
+
+    # perturb by a uniform value in [-1, 1]
+    values = values + np.where(change_values < config.change_weight_mutation, 2 * perturbations - 1, 0)
+
+    replaced = replace_values < config.replace_weight_mutation
+    values[replaced] = utils.rng.normal(0, 1, np.count_nonzero(replaced))
+    return values
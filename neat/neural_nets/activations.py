@@ -1,20 +1,45 @@
-from typing import Callable
+from typing import Callable, Dict
 import math
 import numpy as np
 
 ActivationFunction = Callable[[float], float]
+VectorizedActivationFunction = Callable[[np.ndarray], np.ndarray]
+
+
+class Activation:
+    """An activation function with a scalar variant for single values and a vectorized variant for arrays"""
+
+    def __init__(self, name, function: ActivationFunction, vectorized: VectorizedActivationFunction):
+        self.name = name
+        self.function: ActivationFunction = function
+        self.vectorized: VectorizedActivationFunction = vectorized
 
 
 class Activations:
+    _activations: Dict[str, Activation] = {}
+
+    @staticmethod
+    def register(activation: Activation):
+        """Make an activation function available by its name"""
+        Activations._activations[activation.name] = activation
 
     @staticmethod
     def get(method_name: str) -> ActivationFunction:
+        """Return the activation function for single values"""
+        return Activations._get_activation(method_name).function
+
+    @staticmethod
+    def get_vectorized(method_name: str) -> VectorizedActivationFunction:
+        """Return the activation function which is applied element wise to an array"""
+        return Activations._get_activation(method_name).vectorized
+
+    @staticmethod
+    def _get_activation(method_name: str) -> Activation:
         try:
-            function: ActivationFunction = getattr(_Functions(), method_name)
-        except AttributeError:
+            return Activations._activations[method_name]
+        except KeyError:
             raise NotImplementedError(
                 "Activation function '{}' does not exist.".format(method_name))
-        return function
 
 
 class _Functions:
@@ -27,4 +52,23 @@ class _Functions:
 
     @staticmethod
     def tanh(x: float) -> float:
+        # math.tanh avoids the overhead of calling NumPy with a single value
+        return math.tanh(x)
+
+
+class _VectorizedFunctions:
+
+    @staticmethod
+    def sigmoid(x: np.ndarray) -> np.ndarray:
+        # clip the exponents like the scalar version to avoid an overflow
+        return np.where(x < 0,
+                        1 - 1 / (1 + np.exp(np.minimum(x, 0))),
+                        1 / (1 + np.exp(-np.maximum(x, 0))))
+
+    @staticmethod
+    def tanh(x: np.ndarray) -> np.ndarray:
         return np.tanh(x)
+
+
+Activations.register(Activation("sigmoid", _Functions.sigmoid, _VectorizedFunctions.sigmoid))
+Activations.register(Activation("tanh", _Functions.tanh, _VectorizedFunctions.tanh))
@@ -0,0 +1,123 @@
+from __future__ import annotations
+from typing import List, Tuple, Union
+
+import numpy as np
+
+from neat.neural_nets.activations import Activations
+from neat.neural_nets.activations import VectorizedActivationFunction
+from neat.neural_nets.feed_forward_net import FeedForwardNet
+from neat.config import Config
+
+
+class _Layer:
+    """All nodes of one depth of every packed neural net"""
+
+    def __init__(
+            self,
+            nodes: np.ndarray,
+            biases: np.ndarray,
+            sources: np.ndarray,
+            targets: np.ndarray,
+            weights: np.ndarray,
+            activations: np.ndarray
+    ):
+        # Position of each node in the value array of all nets
+        self.nodes = nodes.astype(int)
+        self.biases = biases.astype(float)
+        # Each edge reads the value of its source and adds it weighted to the
+        # node at position target of this layer
+        self.sources = sources.astype(int)
+        self.targets = targets.astype(int)
+        self.weights = weights.astype(float)
+        # The nodes are activated by one call per activation function of the layer
+        names = np.unique(activations)
+        self.activation_groups: List[Tuple[VectorizedActivationFunction, Union[slice, np.ndarray]]] = [
+            (Activations.get_vectorized(name),
+             slice(None) if len(names) == 1 else np.flatnonzero(activations == name))
+            for name in names]
+
+
+class BatchedFeedForwardNet:
+    """
+    The feed forward nets of a whole generation packed into flat arrays.
+    The node values of all nets share one array, so each layer of all nets
+    is activated by a single NumPy call instead of one call per node and net.
+    """
+
+    def __init__(
+            self,
+            num_values,
+            input_neurons: np.ndarray,
+            output_neurons: np.ndarray,
+            layers: List[_Layer]
+    ):
+        self.num_values = num_values
+        # Positions of the input and output neurons with the shape (number of nets, number of neurons)
+        self.input_neurons = input_neurons
+        self.output_neurons = output_neurons
+        self.layers = layers
+
+    def activate(self, inputs: np.ndarray) -> np.ndarray:
+        """
+        Activate all neural nets at once
+        :param inputs: The input values with one row per neural net
+        :return np.ndarray: The values of the output neurons with one row per neural net
+        """
+        if inputs.shape != self.input_neurons.shape:
+            raise RuntimeError(
+                "Expected inputs of shape {0}, got {1}".format(self.input_neurons.shape, inputs.shape))
+
+        values = np.zeros(self.num_values)
+        values[self.input_neurons] = inputs
+
+        for layer in self.layers:
+            node_inputs = np.bincount(
+                layer.targets, weights=values[layer.sources] * layer.weights, minlength=len(layer.nodes))
+            node_values = layer.biases + node_inputs
+            for activation_function, group in layer.activation_groups:
+                node_values[group] = activation_function(node_values[group])
+            values[layer.nodes] = node_values
+
+        return values[self.output_neurons]
+
+    @staticmethod
+    def create(neural_nets: List[FeedForwardNet], config: Config) -> BatchedFeedForwardNet:
+        """Pack the compiled feed forward nets of a generation into one batched net"""
+        input_neurons = []
+        output_neurons = []
+        # nodes, biases, sources, targets, weights and activations of each layer
+        layers: List[List[List[np.ndarray]]] = []
+        layer_sizes: List[int] = []
+        num_values = 0
+
+        for neural_net in neural_nets:
+            num_inputs = len(neural_net.input_neurons)
+            input_neurons.append(np.arange(num_values, num_values + num_inputs))
+            output_neurons.append(num_values + np.array(neural_net.output_indices, dtype=int))
+
+            num_layers = len(neural_net.layer_offsets) - 1
+            while len(layers) < num_layers:
+                layers.append([[], [], [], [], [], []])
+                layer_sizes.append(0)
+
+            for depth in range(num_layers):
+                first, last = neural_net.layer_offsets[depth], neural_net.layer_offsets[depth + 1]
+                edge_offsets = neural_net.edge_offsets[first:last + 1]
+                num_edges_per_node = np.diff(edge_offsets)
+
+                nodes, biases, sources, targets, weights, activations = layers[depth]
+                nodes.append(num_values + num_inputs + np.arange(first, last))
+                biases.append(neural_net.biases[first:last])
+                sources.append(num_values + neural_net.sources[edge_offsets[0]:edge_offsets[-1]])
+                targets.append(layer_sizes[depth] + np.repeat(np.arange(last - first), num_edges_per_node))
+                weights.append(neural_net.weights[edge_offsets[0]:edge_offsets[-1]])
+                activations.append(np.array(neural_net.activations[first:last], dtype=object))
+                layer_sizes[depth] += last - first
+
+            num_values += neural_net.num_values
+
+        return BatchedFeedForwardNet(
+            num_values,
+            np.array(input_neurons, dtype=int).reshape(len(neural_nets), config.num_input_neurons),
+            np.array(output_neurons, dtype=int).reshape(len(neural_nets), config.num_output_neurons),
+            [_Layer(*(np.concatenate(arrays) for arrays in layer)) for layer in layers])
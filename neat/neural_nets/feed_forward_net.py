@@ -1,8 +1,9 @@
 from __future__ import annotations
-from typing import List, Set
+from typing import Dict, List, Set
+
+import numpy as np
 
 from neat.neural_nets.activations import Activations
-from neat.neural_nets.activations import ActivationFunction
 from neat.config import Config
 from neat.genotype.genome import Genome
 from neat.genotype.genome_edge import GenomeEdge
@@ -14,13 +15,55 @@ class FeedForwardNet:
             self,
             input_neurons: List[int],
             output_neurons: List[int],
-            neural_net,
-            activation_function: ActivationFunction
+            node_ids: List[int],
+            biases: np.ndarray,
+            edge_offsets: np.ndarray,
+            sources: np.ndarray,
+            weights: np.ndarray,
+            layer_offsets: np.ndarray,
+            activations: List[str]
     ):
+        """
+        The neural net is compiled into an evaluation program over a value array.
+        The values of the input neurons are followed by the values of the nodes in
+        node_ids, ordered by the layers, and the values of unconnected output neurons.
+        :param input_neurons: Ids of the input neurons
+        :param output_neurons: Ids of the output neurons
+        :param node_ids: Ids of the nodes to evaluate in the order of evaluation
+        :param biases: Bias of each node to evaluate
+        :param edge_offsets: The incoming edges of the i-th node are
+        sources[edge_offsets[i]:edge_offsets[i + 1]]
+        :param sources: Value index of the source of each edge
+        :param weights: Weight of each edge
+        :param layer_offsets: The nodes of the i-th layer are
+        node_ids[layer_offsets[i]:layer_offsets[i + 1]]
+        :param activations: Name of the activation function of each node to evaluate
+        """
         self.input_neurons = input_neurons
         self.output_neurons = output_neurons
-        self.neural_net = neural_net
-        self.activation_function: ActivationFunction = activation_function
+        self.node_ids = node_ids
+        self.biases = biases
+        self.edge_offsets = edge_offsets
+        self.sources = sources
+        self.weights = weights
+        self.layer_offsets = layer_offsets
+        self.activations = activations
+
+        num_inputs = len(input_neurons)
+        self.num_values = num_inputs + len(node_ids) + len(output_neurons)
+        positions = {node_id: index for index, node_id in enumerate(input_neurons + node_ids)}
+        # unconnected output neurons are placed after the nodes and keep the value 0
+        self.output_indices = [
+            positions.get(node_id, num_inputs + len(node_ids) + index) for index, node_id in enumerate(output_neurons)]
+
+        # Indexing NumPy arrays with scalars is slow, so the program is
+        # evaluated on Python floats
+        sources, weights = sources.tolist(), weights.tolist()
+        functions = {name: Activations.get(name) for name in set(activations)}
+        self._program = [
+            (num_inputs + index, bias, list(zip(sources[start:end], weights[start:end])), functions[activation])
+            for index, (bias, start, end, activation)
+            in enumerate(zip(biases.tolist(), edge_offsets[:-1].tolist(), edge_offsets[1:].tolist(), activations))]
 
     def activate(self, inputs) -> List[float]:
         """
@@ -32,90 +75,144 @@ class FeedForwardNet:
             raise RuntimeError(
                 "Expected {0:n} inputs, got {1:n}".format(len(self.input_neurons), len(inputs)))
 
-        values = {}
-        for input_ids, value in zip(self.input_neurons, inputs):
-            values[input_ids] = value
+        values = [0.0] * self.num_values
+        values[:len(inputs)] = inputs
 
-        for node_id, bias, links in self.neural_net:
-            node_inputs = []
+        for index, bias, links, activation_function in self._program:
+            node_input = 0.0
+            for source, weight in links:
+                node_input += values[source] * weight
 
-            for prev, weights in links:
-                node_inputs.append(values[prev] * weights)
+            values[index] = activation_function(bias + node_input)
 
-            values[node_id] = self.activation_function(bias + sum(node_inputs))
-
-        return [values[i] for i in self.output_neurons]
+        return [values[i] for i in self.output_indices]
 
     def __str__(self):
-        return self.neural_net.__str__()
+        return self._program.__str__()
+
+    @staticmethod
+    def get(genome: Genome, config: Config) -> FeedForwardNet:
+        """
+        Return the compiled feed forward net of the genome, which is cached on the genome
+        until it changes. Elites which are carried over unchanged into the next generation
+        are not compiled again.
+        """
+        key = ("feed_forward_net", config.activation_function)
+        neural_net = genome.cache.get(key)
+        if neural_net is None:
+            neural_net = FeedForwardNet.create(genome, config)
+            genome.cache[key] = neural_net
+        return neural_net
 
     @staticmethod
     def create(genome: Genome, config: Config) -> FeedForwardNet:
-        """Create a feed forward net from a genome"""
+        """
+        Compile a feed forward net from a genome.
+        Disabled edges and edges which do not contribute to the outputs are left out.
+        Nodes without an own activation function use the one of the config.
+        """
         input_neurons = [node.id for node in genome.nodes if node.type == "input"]
         output_neurons = [node.id for node in genome.nodes if node.type == "output"]
 
-        layers = FeedForwardNet.create_layers(input_neurons, output_neurons, genome.edges)
-        neural_net = []
-        for layer in layers:
-            for node in layer:
-                inputs = []
-                for edge in genome.edges:
-                    from_id, to_id = edge.from_id, edge.to_id
-
-                    if to_id == node:
-                        inputs.append((from_id, edge.weight))
-
-                genome_node = genome.get_node_by_id(node)
-                neural_net.append((node, genome_node.bias, inputs))
+        edges = FeedForwardNet.prune_edges(input_neurons, genome.edges)
+        layers = FeedForwardNet.create_layers(input_neurons, output_neurons, edges)
+
+        incoming_edges: Dict[int, List[GenomeEdge]] = {}
+        for edge in edges:
+            incoming_edges.setdefault(edge.to_id, []).append(edge)
+
+        node_ids = [node_id for layer in layers for node_id in sorted(layer)]
+        positions = {node_id: index for index, node_id in enumerate(input_neurons + node_ids)}
+
+        edge_offsets = [0]
+        sources = []
+        weights = []
+        for node_id in node_ids:
+            for edge in incoming_edges.get(node_id, []):
+                sources.append(positions[edge.from_id])
+                weights.append(edge.weight)
+            edge_offsets.append(len(sources))
+
+        nodes = [genome.get_node_by_id(node_id) for node_id in node_ids]
+        return FeedForwardNet(
+            input_neurons,
+            output_neurons,
+            node_ids,
+            np.array([node.bias for node in nodes], dtype=float),
+            np.array(edge_offsets, dtype=int),
+            np.array(sources, dtype=int),
+            np.array(weights, dtype=float),
+            np.cumsum([0] + [len(layer) for layer in layers]),
+            [node.activation or config.activation_function for node in nodes])
 
-        return FeedForwardNet(input_neurons, output_neurons, neural_net, Activations.get(config.activation_function))
+    @staticmethod
+    def prune_edges(inputs: List[int], edges: List[GenomeEdge]) -> List[GenomeEdge]:
+        """Return the enabled edges whose source can be reached from the input neurons"""
+        outgoing_edges: Dict[int, List[GenomeEdge]] = {}
+        for edge in edges:
+            if edge.is_enabled:
+                outgoing_edges.setdefault(edge.from_id, []).append(edge)
+
+        reachable = set(inputs)
+        stack = list(inputs)
+        while stack:
+            for edge in outgoing_edges.get(stack.pop(), []):
+                if edge.to_id not in reachable:
+                    reachable.add(edge.to_id)
+                    stack.append(edge.to_id)
+
+        return [edge for edge in edges if edge.is_enabled and edge.from_id in reachable]
 
     @staticmethod
     def create_layers(inputs: List[int], outputs: List[int], edges: List[GenomeEdge]) -> List[Set[int]]:
-        """Return all the layers of the feed forward network"""
-        layers = []
-        visited = set(inputs)
-
+        """
+        Return all the layers of the feed forward network.
+        A node is placed in the layer after the last layer of its source nodes,
+        which is found by counting down the unvisited incoming edges of each node (Kahn's algorithm).
+        """
         required = FeedForwardNet.required_for_output(inputs, outputs, edges)
 
-        while True:
-            neighbors = set(edge.to_id for edge in edges if edge.from_id in visited and edge.to_id not in visited)
+        successors: Dict[int, List[int]] = {}
+        num_unvisited_sources: Dict[int, int] = {}
+        for edge in edges:
+            successors.setdefault(edge.from_id, []).append(edge.to_id)
+            num_unvisited_sources[edge.to_id] = num_unvisited_sources.get(edge.to_id, 0) + 1
 
+        layers = []
+        visited = set(inputs)
+        layer = set(inputs)
+        while True:
             next_layer = set()
-            for node in neighbors:
-                if node in required and all(edge.from_id in visited for edge in edges if edge.to_id == node):
-                    next_layer.add(node)
+            for node in layer:
+                for successor in successors.get(node, []):
+                    if successor in visited:
+                        continue
+
+                    num_unvisited_sources[successor] -= 1
+                    if num_unvisited_sources[successor] == 0 and successor in required:
+                        next_layer.add(successor)
 
             if not next_layer:
                 break
 
             layers.append(next_layer)
-            visited = visited.union(next_layer)
+            visited.update(next_layer)
+            layer = next_layer
         return layers
 
     @staticmethod
     def required_for_output(inputs: List[int], outputs: List[int], edges: List[GenomeEdge]) -> Set[int]:
         """Return all nodes which are necessary for the output nodes"""
-        required = set(outputs)
-        visited = set(outputs)
+        predecessors: Dict[int, List[int]] = {}
+        for edge in edges:
+            predecessors.setdefault(edge.to_id, []).append(edge.from_id)
 
-        while True:
-            prev_layer = set(edge.from_id for edge in edges if edge.to_id in visited and edge.from_id not in visited)
-
-            if not prev_layer:
-                break
-
-            layer_nodes = set()
-            for prev_id in prev_layer:
-                for node in inputs:
-                    if prev_id != node:
-                        layer_nodes.add(prev_id)
-
-            if not layer_nodes:
-                break
-
-            required = required.union(layer_nodes)
-            visited = visited.union(prev_layer)
+        required = set(outputs)
+        stack = list(outputs)
+        while stack:
+            for prev_id in predecessors.get(stack.pop(), []):
+                if prev_id not in required:
+                    required.add(prev_id)
+                    stack.append(prev_id)
 
         return required
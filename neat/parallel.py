@@ -0,0 +1,118 @@
+import math
+import multiprocessing
+import random
+from typing import Callable, Dict, List, Tuple
+
+import neat.utils as utils
+
+from neat.config import Config
+from neat.genotype.genome import Genome
+from neat.genotype.genome_store import GenomeStore
+from neat.genotype.innovation import registry
+from neat.population import produce_offspring
+
+# Evaluates the genomes of a GenomeStore with the given seed and returns their fitnesses
+ShardEvaluationFunction = Callable[[GenomeStore, Config, int], List[float]]
+
+
+class ParallelEvaluator:
+    """
+    Evaluate the genomes of a generation in a process pool.
+    The genomes are split into one shard per worker and each shard is evaluated in a
+    worker by the shard evaluation function.
+    """
+
+    def __init__(self, num_workers, evaluate_shard: ShardEvaluationFunction, initializer=None, seed=None, initargs=()):
+        """
+        :param num_workers: The number of worker processes
+        :param evaluate_shard: A function which is picklable, i.e. defined at the top level of a module
+        :param initializer: Called once in each worker on startup, e.g. to create the game to play
+        :param seed: The seed of all generations, a new random seed per generation if not given
+        :param initargs: The arguments of the initializer
+        """
+        self.num_workers = num_workers
+        self.seed = seed
+        self.evaluate_shard: ShardEvaluationFunction = evaluate_shard
+        self.pool = multiprocessing.Pool(num_workers, initializer, initargs)
+
+    def evaluate(self, genomes: List[Genome], config: Config):
+        """
+        Evaluate the genomes in the workers and set their fitness.
+        All shards of a generation are evaluated with the same seed, so each shard
+        faces the same conditions, e.g. the same pipes.
+        """
+        seed = random.randrange(2 ** 32) if self.seed is None else self.seed
+        shard_size = math.ceil(len(genomes) / self.num_workers)
+        shards = [genomes[i:i + shard_size] for i in range(0, len(genomes), shard_size)]
+
+        # the gene arrays of a store are much cheaper to send to a worker than the gene objects
+        jobs = [(GenomeStore.pack(dict(enumerate(shard))), config, seed) for shard in shards]
+        for shard, fitnesses in zip(shards, self.pool.starmap(self.evaluate_shard, jobs)):
+            for genome, fitness in zip(shard, fitnesses):
+                genome.fitness = fitness
+
+    def close(self):
+        self.pool.close()
+        self.pool.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class ParallelReproduction:
+    """
+    Produce the children of a generation in a process pool, see Population.produce_offspring.
+    The pairs of parents are split into chunks of a fixed size and each chunk is crossed over
+    and mutated in a worker with its own seed, so the children only depend on the seed of
+    this process and not on the number of workers or on the worker which produced a chunk.
+    """
+
+    def __init__(self, pool: multiprocessing.Pool, chunk_size=25):
+        """
+        :param pool: The worker processes, e.g. the pool of a ParallelEvaluator
+        :param chunk_size: The number of children produced by one job of a worker
+        """
+        self.pool = pool
+        self.chunk_size = chunk_size
+
+    def produce(self, parents: List[Tuple[Genome, Genome]], config: Config) -> List[Genome]:
+        """Crossover and mutate each pair of parents in the workers and return the children in order"""
+        chunks = [parents[i:i + self.chunk_size] for i in range(0, len(parents), self.chunk_size)]
+        # the workers number new edges like this process, so the genes of the children have the same order
+        innovation_nums = registry.snapshot()
+
+        jobs = []
+        for chunk in chunks:
+            # send each parent of a chunk only once
+            indices: Dict[int, int] = {}
+            genomes: Dict[int, Genome] = {}
+            for genome in (genome for pair in chunk for genome in pair):
+                if id(genome) not in indices:
+                    indices[id(genome)] = len(genomes)
+                    genomes[len(genomes)] = genome
+
+            pairs = [(indices[id(parent_a)], indices[id(parent_b)]) for parent_a, parent_b in chunk]
+            jobs.append((GenomeStore.pack(genomes), pairs, innovation_nums, config, random.randrange(2 ** 32)))
+
+        children = []
+        for store in self.pool.starmap(_produce_chunk, jobs):
+            # new edges get the innovation numbers of this process, the known ones keep theirs
+            children.extend(store.unpack(renumber=True).values())
+        return children
+
+
+def _produce_chunk(
+        store: GenomeStore,
+        pairs: List[Tuple[int, int]],
+        innovation_nums: Dict[Tuple[int, int], int],
+        config: Config,
+        seed
+) -> GenomeStore:
+    utils.seed(seed)
+    registry.restore(innovation_nums)
+    genomes = store.unpack()
+    children = produce_offspring([(genomes[a], genomes[b]) for a, b in pairs], config)
+    return GenomeStore.pack(dict(enumerate(children)))
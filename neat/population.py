@@ -1,8 +1,9 @@
 from __future__ import annotations
-from typing import List, Dict
+from typing import Callable, List, Dict, Optional, Set, Tuple
 import numpy as np
 import random
 import math
+import copy
 from itertools import count
 
 from neat.config import Config
@@ -12,6 +13,22 @@ from neat.crossover import crossover
 from neat.mutation import mutate
 import neat.stagnation as stagnation
 
+# Called after each generation, e.g. to print statistics
+Reporter = Callable[["Population"], None]
+
+# Produces one child per pair of parents, in the order of the pairs
+OffspringFunction = Callable[[List[Tuple[Genome, Genome]], Config], List[Genome]]
+
+
+def produce_offspring(parents: List[Tuple[Genome, Genome]], config: Config) -> List[Genome]:
+    """Crossover and mutate each pair of parents"""
+    children = []
+    for parent_a, parent_b in parents:
+        child: Genome = crossover(parent_a, parent_b, config)
+        mutate(child, config)
+        children.append(child)
+    return children
+
 
 class Population:
 
@@ -22,21 +39,86 @@ class Population:
         # could not find any type hint for an iterator
         self.genome_indexer = genome_indexer
         self.config: Config = config
+        # creates the children of a generation, e.g. ParallelReproduction.produce to use a process pool
+        self.produce_offspring: OffspringFunction = produce_offspring
+
+        # the number of evaluated generations
+        self.generation = 0
+        # a copy of the genome with the highest fitness of all generations, which keeps the
+        # fitness of that time while a carried over elite gets evaluated again
+        self.champion: Optional[Genome] = None
+        self.champion_fitness = float("-inf")
+        # the genomes of the last evaluated generation
+        self.evaluated_genomes: List[Genome] = []
+        # the keys of the elites which reproduce carried over into the population
+        self.elite_keys: Set[int] = set()
 
         # assign each genome a specie
         self.species.assign_specie(self.population, 0)
 
-    def run(self, evaluation_function):
-        for curr_gen in range(self.config.num_of_generations):
+    @property
+    def finished(self) -> bool:
+        """Whether all generations ran or a genome reached the fitness threshold"""
+        fitness_threshold = self.config.fitness_threshold
+        return self.generation >= self.config.num_of_generations or \
+            (fitness_threshold is not None and self.champion_fitness >= fitness_threshold)
+
+    def run(self, evaluation_function, num_generations=None, reporter: Optional[Reporter] = None) -> Optional[Genome]:
+        """
+        Evolve the population until all generations ran or a genome reached the fitness threshold
+        :param num_generations: Pause the evolution after this many generations,
+        calling run again continues it
+        :param reporter: Called after each generation which was evaluated and speciated
+        :return: The genome with the highest fitness of all generations
+        """
+        num_run = 0
+        while not self.finished and (num_generations is None or num_run < num_generations):
+            curr_gen = self.generation
             # run flappy bird and change the fitness of each genome depending how good
             # the bird of the genome plays
             evaluation_function(list(self.population.values()), self.config)
+            self.generation += 1
+            num_run += 1
+
+            self.evaluated_genomes = list(self.population.values())
+            best_genome = max(self.evaluated_genomes, key=lambda genome: genome.fitness)
+            if best_genome.fitness > self.champion_fitness:
+                self.champion, self.champion_fitness = copy.deepcopy(best_genome), best_genome.fitness
+
+            if self.finished:
+                break
 
             # Generate a new population by reproducing the non stagnated species
             self.reproduce(curr_gen)
 
             # Assign each genome in the new population a new specie again
             self.species.assign_specie(self.population, curr_gen)
+            if reporter is not None:
+                reporter(self)
+
+        return self.champion
+
+    def best_genomes(self, num_genomes) -> List[Genome]:
+        """Return the genomes with the highest fitness of the last evaluated generation"""
+        return sorted(self.evaluated_genomes, key=lambda genome: genome.fitness, reverse=True)[:num_genomes]
+
+    def add_immigrants(self, genomes: List[Genome]):
+        """
+        Replace the youngest children of the new generation by genomes of another
+        population and assign the species again. The elites are not replaced.
+        """
+        children = [key for key in self.population if key not in self.elite_keys]
+        genomes = genomes[:len(children)]
+        if not genomes:
+            return
+
+        for key in children[-len(genomes):]:
+            del self.population[key]
+        for genome in genomes:
+            self.population[next(self.genome_indexer)] = genome
+
+        # run speciated the new generation with the number of the generation evaluated before
+        self.species.assign_specie(self.population, max(0, self.generation - 1))
 
     def reproduce(self, curr_gen):
         """
@@ -68,7 +150,11 @@ class Population:
         number_offsprings = Population._compute_new_specie_size(
             adjusted_fitnesses, previous_sizes, self.config.population_size, self.config.min_specie_size)
 
-        new_population: Dict[int, genome] = {}
+        new_population: Dict[int, Genome] = {}
+        self.elite_keys = set()
+        # the keys of the children in the order of their parents
+        child_keys: List[int] = []
+        parents: List[Tuple[Genome, Genome]] = []
         for specie, size in zip(remaining_species, number_offsprings):
             survivors = specie.members
             survivors.sort(key=lambda g: g.fitness, reverse=True)
@@ -79,6 +165,7 @@ class Population:
                 if size > 0:
                     key = next(self.genome_indexer)
                     new_population[key] = survivors[i]
+                    self.elite_keys.add(key)
                     size -= 1
 
             if size <= 0:
@@ -90,13 +177,15 @@ class Population:
             for i in range(size):
                 parent_a: Genome = random.choice(survivors)
                 parent_b: Genome = random.choice(survivors)
+                parents.append((parent_a, parent_b))
+                child_keys.append(next(self.genome_indexer))
 
-                child: Genome = crossover(parent_a, parent_b, self.config)
-                mutate(child, self.config)
-                key = next(self.genome_indexer)
-                new_population[key] = child
+        # the elites stay in this process, only the children are produced by produce_offspring
+        for key, child in zip(child_keys, self.produce_offspring(parents, self.config)):
+            new_population[key] = child
 
-        self.population = new_population
+        # keep the order of the keys, i.e. each elite before the children of its specie
+        self.population = dict(sorted(new_population.items()))
 
     @staticmethod
     def _compute_new_specie_size(adjusted_fitnesses, previous_sizes, population_size, min_species_size) -> List[int]:
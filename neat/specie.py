@@ -1,8 +1,11 @@
 from __future__ import annotations
 from typing import List, Optional, Dict
 from itertools import count
+
+import numpy as np
+
 from neat.genotype.genome import Genome
-from neat.genotype.compatibility import calculate_compatibility_score
+from neat.genotype.compatibility import AlignedGenomes, CompatibilityCache
 
 
 class Specie:
@@ -33,28 +36,69 @@ class SpeciesContainer:
         # a lookup from genome to specie based on the
         # genome_indexer and the specie_indexer as the ids
         self.config: Config = config
+        # elites and representatives are compared with the same genomes again in each generation
+        self.compatibility_cache = CompatibilityCache(config.compatibility_cache_size)
 
     def assign_specie(self, population: Dict[int, Genome], curr_gen):
-        """Assign each genome in the population its proper specie"""
+        """
+        Assign each genome in the population its proper specie.
+        The compatibility scores of all genomes with a representative are calculated at once.
+        """
+        self.compatibility_cache.reset_counters()
         unassigned = set(population)
         new_representatives: Dict[int, int] = {}
         new_members: Dict[int, List[Genome]] = {}
 
+        # the old representatives follow the genomes of the population
+        genome_ids = list(population)
+        rows: Dict[int, int] = {genome_id: row for row, genome_id in enumerate(genome_ids)}
+        genomes = [population[genome_id] for genome_id in genome_ids] + \
+            [specie.representative for specie in self.species.values()]
+        aligned_genomes: Optional[AlignedGenomes] = None
+
+        def calculate_compatibility_scores(index) -> np.ndarray:
+            """
+            Return the compatibility scores of the population with the genome at index.
+            Only the scores which are not cached are calculated and the genomes are
+            only aligned if any score is missing.
+            """
+            nonlocal aligned_genomes
+            scores = np.empty(len(genome_ids))
+
+            if self.compatibility_cache.max_size > 0:
+                missing = []
+                for row in range(len(genome_ids)):
+                    score = self.compatibility_cache.get(genomes[index], genomes[row])
+                    if score is None:
+                        missing.append(row)
+                    else:
+                        scores[row] = score
+            else:
+                missing = list(range(len(genome_ids)))
+
+            if missing:
+                if aligned_genomes is None:
+                    aligned_genomes = AlignedGenomes(genomes)
+                scores[missing] = aligned_genomes.compatibility_scores(index, missing)
+                for row in missing:
+                    self.compatibility_cache.put(genomes[index], genomes[row], scores[row])
+            return scores
+
         # assign new representatives for each specie
-        for specie_id, specie in self.species.items():
-            best_candidate_score = float("inf")
-            best_candidate_id = None
-            for genome_id in unassigned:
-                genome = population[genome_id]
-                compatibility_score = calculate_compatibility_score(specie.representative, genome)
-                if compatibility_score < best_candidate_score:
-                    best_candidate_score = compatibility_score
-                    best_candidate_id = genome_id
+        for index, specie_id in enumerate(self.species):
+            compatibility_scores = calculate_compatibility_scores(len(genome_ids) + index)
+            candidates = list(unassigned)
+            best_candidate_id = candidates[
+                np.argmin(compatibility_scores[[rows[genome_id] for genome_id in candidates]])]
 
             new_representatives[specie_id] = best_candidate_id
             new_members[specie_id] = [population[best_candidate_id]]
             unassigned.remove(best_candidate_id)
 
+        representative_scores: Dict[int, np.ndarray] = {
+            specie_id: calculate_compatibility_scores(rows[representative_id])
+            for specie_id, representative_id in new_representatives.items()}
+
         while unassigned:
             genome_id = unassigned.pop()
             genome = population[genome_id]
@@ -62,9 +106,8 @@ class SpeciesContainer:
             best_candidate_score = float("inf")
             best_candidate_id = None
 
-            for specie_id, representative_id in new_representatives.items():
-                representative = population[representative_id]
-                compatibility_score = calculate_compatibility_score(representative, genome)
+            for specie_id, compatibility_scores in representative_scores.items():
+                compatibility_score = compatibility_scores[rows[genome_id]]
                 if compatibility_score < self.config.species_difference and compatibility_score < best_candidate_score:
                     best_candidate_score = compatibility_score
                     best_candidate_id = specie_id
@@ -78,6 +121,7 @@ class SpeciesContainer:
                 new_specie_id = next(self.specie_indexer)
                 new_representatives[new_specie_id] = genome_id
                 new_members[new_specie_id] = [genome]
+                representative_scores[new_specie_id] = calculate_compatibility_scores(rows[genome_id])
 
         # Update class instance SpecieCollection
         for specie_id, representative_id in new_representatives.items():
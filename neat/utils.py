@@ -1,5 +1,17 @@
 import random
 
+import numpy as np
+
+# Generator for vectorized random draws, e.g. all random numbers of a mutation at once
+rng: np.random.Generator = np.random.default_rng()
+
+
+def seed(value):
+    """Seed the random generators used by neat"""
+    global rng
+    random.seed(value)
+    rng = np.random.default_rng(value)
+
 
 def rand_uni_val() -> float:
     """Return a random float on the interval [0, 1]"""